@@ -0,0 +1,171 @@
+#!/usr/bin/env python
+"""
+ADAS Pipeline Benchmark
+Runs the real proximity, detection, HUD and camera-panel code paths against
+the fake CARLA world in fake_carla.py, composited into the headless display
+canvas (or a window on SDL's dummy video driver with --window), and reports per-stage latency percentiles, FPS and peak memory for each
+combination of NPC count and camera count.
+
+Usage:
+    python bench/bench_pipeline.py --npcs 0 20 100 200 --cameras 2 4 --frames 300
+"""
+
+import os
+import sys
+import csv
+import time
+import argparse
+import tempfile
+import tracemalloc
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+SRC_DIR = os.path.join(os.path.dirname(BENCH_DIR), "src")
+sys.path.insert(0, SRC_DIR)
+sys.path.insert(0, BENCH_DIR)
+os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+os.environ.setdefault("SDL_AUDIODRIVER", "dummy")
+
+import numpy as np
+import fake_carla
+
+fake_carla.install()
+
+STAGES = ("tick", "spectator", "proximity", "detection", "dashboard", "camera_panel", "present")
+SIDES = ("left", "right", "front", "rear")
+
+def run_case(npcs, cameras, frames, warmup, detect, frame_source, trace_memory):
+    """Benchmark one scene configuration; returns the per-frame stage timings in seconds."""
+    from adas_config import DETECTION_SKIP_FRAMES, CAMERA_WIDTH, CAMERA_HEIGHT
+    from adas_buffers import FrameBuffer
+    from adas_proximity import ProximityEngine
+    from adas_utils import (follow_vehicle_spectator, check_proximity, detect_blindspot_frames,
+                            update_blindspot_tracks)
+    from adas_dashboard import draw_dashboard, draw_camera_panel, display
+
+    world = fake_carla.World(npc_count=npcs, camera_count=cameras, width=CAMERA_WIDTH,
+                             height=CAMERA_HEIGHT, frames=frame_source)
+    buffers = [FrameBuffer() for _ in range(cameras)]
+    for camera, buffer in zip(world.cameras, buffers):
+        camera.listen(buffer.write)
+    sides = list(SIDES[:cameras])
+    states = [{"level": "clear", "last_detection": 0} for _ in sides]
+    prox_state = {"level": "clear", "last_detection": 0}
+    engine = ProximityEngine(world, world.ego)
+    control = fake_carla.VehicleControl(throttle=0.5)
+    timings = np.zeros((frames, len(STAGES)))
+
+    def step(i, row):
+        t0 = time.perf_counter()
+        world.ego.apply_control(control)
+        world.tick()
+        t1 = time.perf_counter()
+        follow_vehicle_spectator(world, world.ego)
+        t2 = time.perf_counter()
+        prox_alert = check_proximity(world, world.ego, prox_state, engine)
+        t3 = time.perf_counter()
+        if detect and i % DETECTION_SKIP_FRAMES == 0:
+            detect_blindspot_frames([b.frame for b in buffers], states, sides)
+        elif detect:
+            update_blindspot_tracks(states, sides)
+        t4 = time.perf_counter()
+        levels = [s["level"] for s in states] + ["clear", "clear"]
+        draw_dashboard(levels[0], levels[1], False, prox_alert, hud_speed_kph=43.2,
+                       hud_throttle=control.throttle, hud_steer=np.sin(i / 20.0) * 0.5)
+        t5 = time.perf_counter()
+        feeds = ([b.frame for b in buffers] + [None] * 4)[:4]
+        versions = ([b.frame_id for b in buffers] + [None] * 4)[:4]
+        draw_camera_panel(*feeds, versions=versions)
+        t6 = time.perf_counter()
+        display.present()
+        t7 = time.perf_counter()
+        if row is not None:
+            timings[row] = (t1 - t0, t2 - t1, t3 - t2, t4 - t3, t5 - t4, t6 - t5, t7 - t6)
+
+    for i in range(warmup):
+        step(i, None)
+    start = time.perf_counter()
+    for i in range(frames):
+        step(warmup + i, i)
+    wall = time.perf_counter() - start
+
+    peak = None
+    if trace_memory:
+        # Separate traced pass so tracemalloc overhead does not skew the timings.
+        tracemalloc.start()
+        for i in range(max(1, frames // 4)):
+            step(warmup + frames + i, None)
+        peak = tracemalloc.get_traced_memory()[1]
+        tracemalloc.stop()
+    return timings, wall, peak
+
+def peak_rss_mb():
+    """Process peak resident set size in MB, where the platform reports it."""
+    try:
+        import resource
+    except ImportError:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024.0 * 1024.0) if sys.platform == "darwin" else rss / 1024.0
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless ADAS pipeline benchmark")
+    parser.add_argument("--npcs", type=int, nargs="+", default=[0, 20, 100], help="NPC counts to sweep")
+    parser.add_argument("--cameras", type=int, nargs="+", default=[2, 4], choices=[1, 2, 3, 4],
+                        help="camera counts to sweep")
+    parser.add_argument("--frames", type=int, default=300, help="measured frames per case")
+    parser.add_argument("--warmup", type=int, default=30, help="unmeasured frames per case")
+    parser.add_argument("--no-detect", action="store_true", help="skip YOLO detection")
+    parser.add_argument("--no-memory", action="store_true", help="skip the traced memory pass")
+    parser.add_argument("--recorded", metavar="DIR", help="use recorded images instead of synthetic frames")
+    parser.add_argument("--window", action="store_true",
+                        help="present into a pygame window (SDL dummy driver unless SDL_VIDEODRIVER is set)")
+    parser.add_argument("--csv", metavar="FILE", help="write the summary table to a CSV file")
+    args = parser.parse_args()
+
+    import adas_config
+    adas_config.LOGS_DIR = tempfile.mkdtemp(prefix="adas_bench_logs_")
+    adas_config.start_services()
+    if args.no_detect:
+        adas_config.get_logger()
+    else:
+        adas_config.wait_for_services()
+    adas_config.print_startup_report()
+    frame_source = None
+    if args.recorded:
+        frame_source = fake_carla.load_frames(args.recorded, adas_config.CAMERA_WIDTH,
+                                              adas_config.CAMERA_HEIGHT)
+
+    from adas_dashboard import display
+    display.headless = not args.window
+    display.open()
+    rows = []
+    for npcs in args.npcs:
+        for cameras in args.cameras:
+            timings, wall, peak = run_case(npcs, cameras, args.frames, args.warmup,
+                                           not args.no_detect, frame_source, not args.no_memory)
+            fps = args.frames / wall
+            mem = f", peak traced memory {peak / 1e6:.1f} MB" if peak is not None else ""
+            print(f"\nNPCs={npcs} cameras={cameras}: {fps:.1f} FPS{mem}")
+            print(f"  {'stage':<14}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}")
+            row = {"npcs": npcs, "cameras": cameras, "fps": round(fps, 2),
+                   "peak_traced_mb": round(peak / 1e6, 2) if peak is not None else ""}
+            for j, stage in enumerate(STAGES + ("total",)):
+                values = timings[:, j] if j < len(STAGES) else timings.sum(axis=1)
+                p50, p95, p99 = np.percentile(values, [50, 95, 99]) * 1000
+                print(f"  {stage:<14}{p50:9.2f}{p95:9.2f}{p99:9.2f}")
+                row.update({f"{stage}_p50_ms": round(p50, 3), f"{stage}_p95_ms": round(p95, 3),
+                            f"{stage}_p99_ms": round(p99, 3)})
+            rows.append(row)
+    rss = peak_rss_mb()
+    if rss is not None:
+        print(f"\nProcess peak RSS: {rss:.1f} MB")
+    adas_config.get_logger().close()
+    if args.csv and rows:
+        with open(args.csv, "w", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=list(rows[0].keys()))
+            writer.writeheader()
+            writer.writerows(rows)
+        print(f"Summary written to {args.csv}")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,231 @@
+#!/usr/bin/env python
+"""
+Fake CARLA Module
+Minimal in-process stand-in for the parts of the ``carla`` API the ADAS code
+uses, so the pipeline can be benchmarked without a simulator. Install it with
+``fake_carla.install()`` before importing any ``adas_*`` module.
+"""
+
+import sys
+import math
+import fnmatch
+import itertools
+import numpy as np
+import cv2
+
+class Vector3D:
+    def __init__(self, x=0.0, y=0.0, z=0.0):
+        self.x, self.y, self.z = float(x), float(y), float(z)
+
+    def length(self):
+        return math.sqrt(self.x ** 2 + self.y ** 2 + self.z ** 2)
+
+class Location(Vector3D):
+    def distance(self, other):
+        return math.sqrt((self.x - other.x) ** 2 + (self.y - other.y) ** 2 + (self.z - other.z) ** 2)
+
+class Rotation:
+    def __init__(self, pitch=0.0, yaw=0.0, roll=0.0):
+        self.pitch, self.yaw, self.roll = float(pitch), float(yaw), float(roll)
+
+class Transform:
+    def __init__(self, location=None, rotation=None):
+        self.location = location or Location()
+        self.rotation = rotation or Rotation()
+
+    def get_forward_vector(self):
+        yaw, pitch = math.radians(self.rotation.yaw), math.radians(self.rotation.pitch)
+        return Vector3D(math.cos(pitch) * math.cos(yaw), math.cos(pitch) * math.sin(yaw), math.sin(pitch))
+
+    def transform(self, loc):
+        yaw = math.radians(self.rotation.yaw)
+        c, s = math.cos(yaw), math.sin(yaw)
+        return Location(self.location.x + loc.x * c - loc.y * s,
+                        self.location.y + loc.x * s + loc.y * c,
+                        self.location.z + loc.z)
+
+class VehicleControl:
+    def __init__(self, throttle=0.0, steer=0.0, brake=0.0, reverse=False):
+        self.throttle, self.steer, self.brake, self.reverse = throttle, steer, brake, reverse
+
+class ActorList(list):
+    def filter(self, pattern):
+        return ActorList(a for a in self if fnmatch.fnmatch(a.type_id, pattern))
+
+class Actor:
+    def __init__(self, world, actor_id, type_id):
+        self.world = world
+        self.id = actor_id
+        self.type_id = type_id
+
+    def _row(self):
+        return self.world.actor_index[self.id]
+
+    def get_location(self):
+        return Location(*self.world.positions[self._row()])
+
+    def get_velocity(self):
+        return Vector3D(*self.world.velocities[self._row()])
+
+    def get_transform(self):
+        row = self._row()
+        return Transform(Location(*self.world.positions[row]), Rotation(yaw=self.world.yaws[row]))
+
+    def set_transform(self, transform):
+        row = self._row()
+        loc = transform.location
+        self.world.positions[row] = (loc.x, loc.y, loc.z)
+        self.world.yaws[row] = transform.rotation.yaw
+
+    def apply_control(self, control):
+        self.world.control = control
+
+    def set_autopilot(self, enabled=True, port=None):
+        pass
+
+    def destroy(self):
+        return True
+
+class ActorSnapshot:
+    def __init__(self, actor_id, location, velocity, yaw):
+        self.id = actor_id
+        self._location, self._velocity, self._yaw = location, velocity, yaw
+
+    def get_transform(self):
+        return Transform(Location(*self._location), Rotation(yaw=self._yaw))
+
+    def get_velocity(self):
+        return Vector3D(*self._velocity)
+
+class WorldSnapshot(list):
+    def __init__(self, frame, items):
+        list.__init__(self, items)
+        self.frame = frame
+        self._by_id = {a.id: a for a in self}
+
+    def find(self, actor_id):
+        return self._by_id.get(actor_id)
+
+class Image:
+    def __init__(self, frame, timestamp, bgra):
+        self.frame = frame
+        self.timestamp = timestamp
+        self.height, self.width = bgra.shape[:2]
+        self.raw_data = bgra.data
+
+class Camera(Actor):
+    def __init__(self, world, actor_id, frames):
+        Actor.__init__(self, world, actor_id, "sensor.camera.rgb")
+        self.frames = frames
+        self.callback = None
+
+    def listen(self, callback):
+        self.callback = callback
+
+    def stop(self):
+        self.callback = None
+
+    def emit(self, frame_id, timestamp):
+        if self.callback is not None:
+            self.callback(Image(frame_id, timestamp, self.frames[frame_id % len(self.frames)]))
+
+def synthetic_frames(count, width, height, seed=0):
+    """Road-like BGRA frames with a few vehicle-sized blocks drifting across them."""
+    rng = np.random.RandomState(seed)
+    base = np.zeros((height, width, 4), dtype=np.uint8)
+    base[:height // 2] = (200, 170, 130, 255)
+    base[height // 2:] = (70, 70, 70, 255)
+    boxes = [(rng.randint(0, width), rng.randint(height // 2, height - 40),
+              rng.randint(30, 90), rng.randint(20, 60), rng.randint(-6, 7)) for _ in range(3)]
+    frames = []
+    for i in range(count):
+        im = base.copy()
+        for x, y, w, h, dx in boxes:
+            x0 = (x + dx * i) % width
+            color = tuple(int(c) for c in rng.randint(0, 255, 3)) + (255,)
+            cv2.rectangle(im, (x0, y), (x0 + w, y + h), color, -1)
+        im[:, :, :3] += rng.randint(0, 8, (height, width, 3), dtype=np.uint8)
+        frames.append(im)
+    return frames
+
+def load_frames(path, width, height):
+    """Load recorded images from a directory as BGRA frames of the camera size."""
+    import glob
+    import os
+    frames = []
+    for file in sorted(glob.glob(os.path.join(path, "*"))):
+        if os.path.splitext(file)[1].lower() not in (".png", ".jpg", ".jpeg", ".bmp"):
+            continue
+        im = cv2.resize(cv2.imread(file), (width, height))
+        frames.append(cv2.cvtColor(im, cv2.COLOR_BGR2BGRA))
+    return frames
+
+class World:
+    """Synchronous fake world: an ego vehicle, NPCs on constant-velocity paths and cameras."""
+
+    def __init__(self, npc_count=20, camera_count=4, width=320, height=240, frames=None,
+                 delta_seconds=0.05, seed=0):
+        rng = np.random.RandomState(seed)
+        self.delta_seconds = delta_seconds
+        self.frame = 0
+        self.elapsed = 0.0
+        self.control = VehicleControl()
+        self._ids = itertools.count(1)
+        n = npc_count + 2
+        self.positions = np.zeros((n, 3))
+        self.velocities = np.zeros((n, 3))
+        self.yaws = np.zeros(n)
+        self.actors = []
+        self.actor_index = {}
+        self.ego = self._add_actor("vehicle.tesla.model3")
+        self.velocities[0] = (12.0, 0.0, 0.0)
+        self.spectator = self._add_actor("spectator")
+        for _ in range(npc_count):
+            row = len(self.actors)
+            self._add_actor("vehicle.audi.a2")
+            angle = rng.uniform(0, 2 * np.pi)
+            radius = rng.uniform(3.0, 80.0)
+            self.positions[row] = (radius * np.cos(angle), radius * np.sin(angle), 0.0)
+            self.velocities[row] = (rng.uniform(5.0, 20.0), rng.uniform(-0.5, 0.5), 0.0)
+        if frames is None:
+            frames = synthetic_frames(16, width, height, seed)
+        self.cameras = [Camera(self, next(self._ids), frames[i::camera_count] or frames)
+                        for i in range(camera_count)]
+
+    def _add_actor(self, type_id):
+        actor = Actor(self, next(self._ids), type_id)
+        self.actor_index[actor.id] = len(self.actors)
+        self.actors.append(actor)
+        return actor
+
+    def tick(self):
+        self.frame += 1
+        self.elapsed += self.delta_seconds
+        self.positions += self.velocities * self.delta_seconds
+        # Keep NPCs within 100 m of the ego so the scene density stays constant.
+        rel = self.positions[2:, 0] - self.positions[0, 0]
+        self.positions[2:, 0] -= np.where(rel > 100, 200, np.where(rel < -100, -200, 0))
+        for camera in self.cameras:
+            camera.emit(self.frame, self.elapsed)
+        return self.frame
+
+    def get_snapshot(self):
+        items = [ActorSnapshot(a.id, tuple(self.positions[i]), tuple(self.velocities[i]), self.yaws[i])
+                 for i, a in enumerate(self.actors)]
+        items += [ActorSnapshot(c.id, tuple(self.positions[0]), (0.0, 0.0, 0.0), 0.0) for c in self.cameras]
+        return WorldSnapshot(self.frame, items)
+
+    def get_actors(self, actor_ids=None):
+        actors = ActorList(self.actors + self.cameras)
+        if actor_ids is None:
+            return actors
+        wanted = set(actor_ids)
+        return ActorList(a for a in actors if a.id in wanted)
+
+    def get_spectator(self):
+        return self.spectator
+
+def install():
+    """Register this module as ``carla`` so ADAS modules import it instead of the real API."""
+    sys.modules["carla"] = sys.modules[__name__]
+    return sys.modules[__name__]
@@ -5,7 +5,6 @@ Each warning type gets a distinct sound pattern.
 """
 import numpy as np
 import wave
-import struct
 import os
 
 # Get project root and assets directory
@@ -13,55 +12,34 @@ PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 ASSETS_DIR = os.path.join(PROJECT_ROOT, "assets")
 os.makedirs(ASSETS_DIR, exist_ok=True)
 
-def create_wav(filename, frequency, duration, sample_rate=44100):
-    """Create a simple sine wave WAV file"""
-    samples = int(sample_rate * duration)
-    data = []
-    for i in range(samples):
-        value = int(32767.0 * np.sin(2.0 * np.pi * frequency * i / sample_rate))
-        data.append(struct.pack('<h', value))
-    
+def sine(frequency, duration, sample_rate=44100):
+    """Sine wave samples as 16-bit PCM"""
+    t = np.arange(int(sample_rate * duration)) / sample_rate
+    return (32767.0 * np.sin(2.0 * np.pi * frequency * t)).astype('<i2')
+
+def write_wav(filename, samples, sample_rate=44100):
+    """Write mono 16-bit samples to assets/filename"""
     filepath = os.path.join(ASSETS_DIR, filename)
     with wave.open(filepath, 'w') as wav_file:
         wav_file.setnchannels(1)  # Mono
         wav_file.setsampwidth(2)   # 16-bit
         wav_file.setframerate(sample_rate)
-        wav_file.writeframes(b''.join(data))
-    
+        wav_file.writeframes(samples.tobytes())
     return filepath
 
+def create_wav(filename, frequency, duration, sample_rate=44100):
+    """Create a simple sine wave WAV file"""
+    return write_wav(filename, sine(frequency, duration, sample_rate), sample_rate)
+
 def create_double_beep(filename, frequency, beep_duration=0.15, gap=0.05, sample_rate=44100):
     """Create a double beep pattern (beep-gap-beep)"""
-    beep_samples = int(sample_rate * beep_duration)
-    gap_samples = int(sample_rate * gap)
-    
-    data = []
-    
-    # First beep
-    for i in range(beep_samples):
-        value = int(32767.0 * np.sin(2.0 * np.pi * frequency * i / sample_rate))
-        data.append(struct.pack('<h', value))
-    
-    # Gap (silence)
-    for i in range(gap_samples):
-        data.append(struct.pack('<h', 0))
-    
-    # Second beep
-    for i in range(beep_samples):
-        value = int(32767.0 * np.sin(2.0 * np.pi * frequency * i / sample_rate))
-        data.append(struct.pack('<h', value))
-    
-    filepath = os.path.join(ASSETS_DIR, filename)
-    with wave.open(filepath, 'w') as wav_file:
-        wav_file.setnchannels(1)
-        wav_file.setsampwidth(2)
-        wav_file.setframerate(sample_rate)
-        wav_file.writeframes(b''.join(data))
-    
-    return filepath
+    beep = sine(frequency, beep_duration, sample_rate)
+    silence = np.zeros(int(sample_rate * gap), dtype='<i2')
+    return write_wav(filename, np.concatenate([beep, silence, beep]), sample_rate)
 
 if __name__ == "__main__":
     print("Creating warning sound files...")
+    print("(The dashboard synthesizes these tones itself; the files are only used with AUDIO_USE_FILES.)")
     print("=" * 60)
     
     # Blind spot warning: High-pitched short beep (urgent)
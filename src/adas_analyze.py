@@ -0,0 +1,348 @@
+#!/usr/bin/env python
+"""
+ADAS Log Analyzer
+Streams detections_*.csv (or .rec) logs in fixed-size chunks of typed NumPy
+records and reports per-side alert rates, warn-episode durations, confidence
+histograms and proximity distance / relative-speed distributions. Memory use
+is bounded by the chunk size, not the log size. ``--index`` caches each CSV
+as raw records next to it so repeat queries skip CSV parsing and seek
+straight to the requested time window.
+
+Usage:
+    python src/adas_analyze.py                           # all logs/detections_*.csv
+    python src/adas_analyze.py logs/detections_20251105_*.csv --start "2025-11-05 14:00" --index
+"""
+
+import os
+import csv
+import glob
+import json
+import datetime
+import argparse
+import itertools
+import numpy as np
+from adas_config import LOGS_DIR
+from adas_logging import RECORD_DTYPE
+
+CHUNK_ROWS = 100000
+SIDES = ("left", "right", "front", "rear")
+LEVELS = ("clear", "near", "warn")
+CONF_BINS = np.linspace(0.0, 1.0, 21)
+DURATION_BINS = np.r_[np.arange(0.0, 10.0, 0.5), np.arange(10.0, 61.0, 5.0)]
+DISTANCE_BINS = np.arange(0.0, 51.0, 2.5)
+SPEED_BINS = np.arange(-20.0, 21.0, 2.0)
+
+def _floats(col):
+    return np.array([value or "nan" for value in col], dtype=np.float64)
+
+def _csv_times(col):
+    """Naive local ``str(datetime)`` stamps to epoch seconds."""
+    naive = np.array(col, dtype="datetime64[us]").astype(np.int64) / 1e6
+    offset = datetime.datetime.fromisoformat(col[0]).timestamp() - naive[0]
+    return naive + offset
+
+def _csv_chunks(path, rows):
+    with open(path, newline="") as f:
+        reader = csv.reader(f)
+        header = next(reader, None)
+        if not header:
+            return
+        index = {name: i for i, name in enumerate(header)}
+        while True:
+            block = [r for r in itertools.islice(reader, rows) if len(r) == len(header)]
+            if not block:
+                break
+            cols = list(zip(*block))
+            chunk = np.zeros(len(block), dtype=RECORD_DTYPE)
+            chunk["time"] = _csv_times(cols[index["time"]])
+            for name, width in (("vehicle_detected", 16), ("side", 8), ("alert_level", 8)):
+                if name in index:
+                    chunk[name] = np.array(cols[index[name]]).astype(f"S{width}")
+            for name in ("confidence", "distance_m", "rel_speed_mps"):
+                chunk[name] = _floats(cols[index[name]]) if name in index else np.nan
+            if "lane_departure" in index:
+                chunk["lane_departure"] = [v not in ("", "0", "False") for v in cols[index["lane_departure"]]]
+            if "track_id" in index:
+                chunk["track_id"] = np.nan_to_num(_floats(cols[index["track_id"]]), nan=-1)
+            else:
+                chunk["track_id"] = -1
+            yield chunk
+
+def _rec_chunks(path, rows):
+    """Regroup the logger's per-batch ``np.save`` chunks into ``rows``-sized arrays."""
+    pending, size = [], 0
+    with open(path, "rb") as f:
+        while True:
+            try:
+                part = np.load(f)
+            except (EOFError, ValueError, OSError):
+                break
+            pending.append(part)
+            size += len(part)
+            if size >= rows:
+                yield np.concatenate(pending)
+                pending, size = [], 0
+    if pending:
+        yield np.concatenate(pending)
+
+def _index_paths(path):
+    return path + ".idx", path + ".idx.json"
+
+def _cached_index(path):
+    """Memmap of a still-valid index for ``path``, or None."""
+    data, meta = _index_paths(path)
+    if not (os.path.exists(data) and os.path.exists(meta)):
+        return None
+    with open(meta) as f:
+        info = json.load(f)
+    st = os.stat(path)
+    if info.get("size") != st.st_size or info.get("mtime_ns") != st.st_mtime_ns:
+        return None
+    if info.get("rows", 0) == 0:
+        return np.zeros(0, dtype=RECORD_DTYPE)
+    return np.memmap(data, dtype=RECORD_DTYPE, mode="r")
+
+def _indexing(chunks, path):
+    """Pass ``chunks`` through while appending them to a fresh index of ``path``."""
+    data, meta = _index_paths(path)
+    st = os.stat(path)
+    rows = 0
+    with open(data + ".tmp", "wb") as f:
+        for chunk in chunks:
+            chunk.tofile(f)
+            rows += len(chunk)
+            yield chunk
+    os.replace(data + ".tmp", data)
+    with open(meta, "w") as f:
+        json.dump({"size": st.st_size, "mtime_ns": st.st_mtime_ns, "rows": rows}, f)
+
+def iter_records(path, rows=CHUNK_ROWS, start=None, end=None, index=False):
+    """Yield ``RECORD_DTYPE`` chunks of at most ``rows`` records from one log, limited to [start, end)."""
+    cached = _cached_index(path) if index else None
+    if cached is not None:
+        lo = np.searchsorted(cached["time"], start) if start is not None else 0
+        hi = np.searchsorted(cached["time"], end) if end is not None else len(cached)
+        for i in range(lo, hi, rows):
+            yield np.array(cached[i:min(i + rows, hi)])
+        return
+    chunks = _rec_chunks(path, rows) if path.endswith(".rec") else _csv_chunks(path, rows)
+    if index and not path.endswith(".rec"):
+        chunks = _indexing(chunks, path)
+    for chunk in chunks:
+        if start is not None or end is not None:
+            keep = np.ones(len(chunk), dtype=bool)
+            if start is not None:
+                keep &= chunk["time"] >= start
+            if end is not None:
+                keep &= chunk["time"] < end
+            chunk = chunk[keep]
+        if len(chunk):
+            yield chunk
+
+class Episodes:
+    """Streaming grouping of event times into episodes separated by more than ``gap`` seconds."""
+
+    def __init__(self, gap, bins=DURATION_BINS):
+        self.gap = gap
+        self.bins = bins
+        self.hist = np.zeros(len(bins), dtype=np.int64)
+        self.count = 0
+        self.total = 0.0
+        self.longest = 0.0
+        self.start = self.last = None
+
+    def _close(self, durations):
+        if len(durations):
+            idx = np.clip(np.searchsorted(self.bins, durations, side="right") - 1, 0, len(self.bins) - 1)
+            self.hist += np.bincount(idx, minlength=len(self.bins))
+            self.count += len(durations)
+            self.total += float(durations.sum())
+            self.longest = max(self.longest, float(durations.max()))
+
+    def add(self, times):
+        if not len(times):
+            return
+        breaks = np.flatnonzero(np.diff(times) > self.gap)
+        starts = np.r_[times[0], times[breaks + 1]]
+        ends = np.r_[times[breaks], times[-1]]
+        if self.last is not None and times[0] - self.last <= self.gap:
+            starts[0] = self.start
+        elif self.last is not None:
+            self._close(np.array([self.last - self.start]))
+        self._close(ends[:-1] - starts[:-1])
+        self.start, self.last = starts[-1], ends[-1]
+
+    def finish(self):
+        if self.last is not None:
+            self._close(np.array([self.last - self.start]))
+            self.start = self.last = None
+
+def _hist(values, bins):
+    """Counts per bin; values below/above the range fall into the first/last bin."""
+    idx = np.clip(np.searchsorted(bins, values, side="right") - 1, 0, len(bins) - 2)
+    return np.bincount(idx, minlength=len(bins) - 1)
+
+class LogStats:
+    """Bounded-memory accumulators updated one chunk at a time."""
+
+    def __init__(self, gap=1.0):
+        self.rows = 0
+        self.first = self.last = None
+        self.lane_departures = 0
+        self.level_counts = {side: np.zeros(len(LEVELS), dtype=np.int64) for side in SIDES}
+        self.alerts = {side: Episodes(gap) for side in SIDES}
+        self.warns = {side: Episodes(gap) for side in SIDES}
+        self.confidence = {side: np.zeros(len(CONF_BINS) - 1, dtype=np.int64) for side in SIDES}
+        self.distance = np.zeros(len(DISTANCE_BINS) - 1, dtype=np.int64)
+        self.rel_speed = np.zeros(len(SPEED_BINS) - 1, dtype=np.int64)
+        self.proximity_rows = 0
+        self.min_distance = np.inf
+        self.distance_sum = 0.0
+
+    def add(self, chunk):
+        t = chunk["time"]
+        self.rows += len(chunk)
+        self.first = t[0] if self.first is None else min(self.first, t[0])
+        self.last = t[-1] if self.last is None else max(self.last, t[-1])
+        self.lane_departures += int(np.count_nonzero(chunk["lane_departure"]))
+        sides, levels = chunk["side"], chunk["alert_level"]
+        for side in SIDES:
+            mine = sides == side.encode()
+            if not mine.any():
+                continue
+            side_levels = levels[mine]
+            for i, level in enumerate(LEVELS):
+                self.level_counts[side][i] += int(np.count_nonzero(side_levels == level.encode()))
+            side_times = t[mine]
+            self.alerts[side].add(side_times[side_levels != b"clear"])
+            self.warns[side].add(side_times[side_levels == b"warn"])
+            conf = chunk["confidence"][mine]
+            self.confidence[side] += _hist(conf[~np.isnan(conf)], CONF_BINS)
+        dist = chunk["distance_m"]
+        ahead = ~np.isnan(dist)
+        if ahead.any():
+            d = dist[ahead].astype(np.float64)
+            self.proximity_rows += len(d)
+            self.min_distance = min(self.min_distance, float(d.min()))
+            self.distance_sum += float(d.sum())
+            self.distance += _hist(d, DISTANCE_BINS)
+            speed = chunk["rel_speed_mps"][ahead]
+            self.rel_speed += _hist(speed[~np.isnan(speed)], SPEED_BINS)
+
+    def finish(self):
+        for episodes in list(self.alerts.values()) + list(self.warns.values()):
+            episodes.finish()
+
+    @property
+    def duration(self):
+        return (self.last - self.first) if self.rows else 0.0
+
+    def summary(self):
+        """Plain dict of the results (JSON-serializable)."""
+        hours = self.duration / 3600.0
+        sides = {}
+        for side in SIDES:
+            counts = self.level_counts[side]
+            if not counts.any():
+                continue
+            alerts, warns = self.alerts[side], self.warns[side]
+            sides[side] = {
+                "rows": int(counts.sum()),
+                "levels": dict(zip(LEVELS, counts.tolist())),
+                "alerts": alerts.count,
+                "alerts_per_hour": alerts.count / hours if hours else None,
+                "warn_episodes": warns.count,
+                "warn_mean_s": warns.total / warns.count if warns.count else 0.0,
+                "warn_max_s": warns.longest,
+                "warn_duration_hist": dict(zip(DURATION_BINS.tolist(), warns.hist.tolist())),
+                "confidence_hist": dict(zip(CONF_BINS[:-1].round(2).tolist(), self.confidence[side].tolist())),
+            }
+        return {
+            "rows": self.rows,
+            "start": datetime.datetime.fromtimestamp(self.first).isoformat() if self.rows else None,
+            "end": datetime.datetime.fromtimestamp(self.last).isoformat() if self.rows else None,
+            "duration_s": self.duration,
+            "lane_departures": self.lane_departures,
+            "sides": sides,
+            "proximity": {
+                "rows": self.proximity_rows,
+                "min_distance_m": self.min_distance if self.proximity_rows else None,
+                "mean_distance_m": self.distance_sum / self.proximity_rows if self.proximity_rows else None,
+                "distance_hist": dict(zip(DISTANCE_BINS[:-1].tolist(), self.distance.tolist())),
+                "rel_speed_hist": dict(zip(SPEED_BINS[:-1].tolist(), self.rel_speed.tolist())),
+            },
+        }
+
+def analyze(paths, start=None, end=None, gap=1.0, rows=CHUNK_ROWS, index=False):
+    """Stream every log in ``paths`` (in order) through one LogStats."""
+    stats = LogStats(gap)
+    for path in paths:
+        for chunk in iter_records(path, rows, start, end, index):
+            stats.add(chunk)
+    stats.finish()
+    return stats
+
+def _bars(hist, labels, width=40):
+    """Text histogram rows, trimmed to the range of non-empty bins."""
+    filled = [i for i, count in enumerate(hist) if count]
+    if not filled:
+        return ["    (no data)"]
+    peak = max(hist)
+    return [f"    {label:>8} {count:8d} {'#' * int(round(width * count / peak))}"
+            for label, count in list(zip(labels, hist))[filled[0]:filled[-1] + 1]]
+
+def print_report(stats):
+    s = stats.summary()
+    if not s["rows"]:
+        print("No log rows in the selected window")
+        return
+    print(f"{s['rows']} rows, {s['start']} to {s['end']} ({s['duration_s'] / 60:.1f} min), "
+          f"{s['lane_departures']} lane departure rows")
+    for side, d in s["sides"].items():
+        rate = f"{d['alerts_per_hour']:.1f}/h" if d["alerts_per_hour"] is not None else "n/a"
+        print(f"\n[{side}] {d['rows']} rows  near {d['levels']['near']}  warn {d['levels']['warn']}")
+        print(f"  alerts {d['alerts']} ({rate}), warn episodes {d['warn_episodes']} "
+              f"(mean {d['warn_mean_s']:.2f} s, max {d['warn_max_s']:.2f} s)")
+        if d["warn_episodes"]:
+            print("  warn duration (s):")
+            print("\n".join(_bars(list(d["warn_duration_hist"].values()), list(d["warn_duration_hist"]))))
+        print("  confidence:")
+        print("\n".join(_bars(list(d["confidence_hist"].values()),
+                              [f"{c:.2f}" for c in d["confidence_hist"]])))
+    p = s["proximity"]
+    if p["rows"]:
+        print(f"\n[proximity] {p['rows']} rows, min {p['min_distance_m']:.1f} m, mean {p['mean_distance_m']:.1f} m")
+        print("  distance (m):")
+        print("\n".join(_bars(list(p["distance_hist"].values()), list(p["distance_hist"]))))
+        print("  relative speed (m/s):")
+        print("\n".join(_bars(list(p["rel_speed_hist"].values()), list(p["rel_speed_hist"]))))
+
+def _when(text):
+    return datetime.datetime.fromisoformat(text).timestamp() if text else None
+
+def main():
+    parser = argparse.ArgumentParser(description="Summarize ADAS detection logs in bounded memory")
+    parser.add_argument("logs", nargs="*", help="detections_*.csv or .rec files (default: all CSV logs in logs/)")
+    parser.add_argument("--start", help="only rows at or after this local time (YYYY-MM-DD[ HH:MM[:SS]])")
+    parser.add_argument("--end", help="only rows before this local time")
+    parser.add_argument("--gap", type=float, default=1.0,
+                        help="seconds without a non-clear row that end an alert or warn episode")
+    parser.add_argument("--chunk", type=int, default=CHUNK_ROWS, help="rows per chunk")
+    parser.add_argument("--index", action="store_true",
+                        help="build/use a cached binary index (<log>.idx) for faster repeat queries")
+    parser.add_argument("--json", metavar="FILE", help="also write the summary as JSON")
+    args = parser.parse_args()
+
+    paths = args.logs or sorted(glob.glob(os.path.join(LOGS_DIR, "detections_*.csv")))
+    if not paths:
+        print(f"No detection logs found in {LOGS_DIR}")
+        return
+    stats = analyze(paths, _when(args.start), _when(args.end), args.gap, max(1, args.chunk), args.index)
+    print_report(stats)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(stats.summary(), f, indent=2)
+        print(f"\nSummary written to {args.json}")
+
+if __name__ == '__main__':
+    main()
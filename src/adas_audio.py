@@ -0,0 +1,153 @@
+#!/usr/bin/env python
+"""
+ADAS Alert Audio
+Synthesizes the warning tones in memory with NumPy at startup and plays
+each alert type on its own reserved mixer channel. A small mixer buffer
+keeps output latency low, and a priority policy ducks lower-priority
+alerts while a more urgent one is sounding (proximity > blind spot > lane).
+An estimate of trigger-to-playback latency (time from the trigger to the
+channel being started, plus one mixer buffer for the device) is recorded into
+``adas_metrics.audio_latency_estimate``; SDL_mixer starts a channel
+synchronously and the device delay cannot be observed through pygame.
+"""
+
+import os
+import time
+import threading
+import numpy as np
+import pygame
+from adas_config import (ASSETS_DIR, AUDIO_SAMPLE_RATE, AUDIO_BUFFER, AUDIO_DUCK_VOLUME, AUDIO_USE_FILES,
+                         ALERT_PRIORITY)
+
+# name -> (frequency Hz, beep seconds, beeps, gap seconds); see docs/AUDIO_SYSTEM.md
+ALERT_TONES = {
+    "blindspot": (1200, 0.20, 1, 0.0),
+    "proximity": (800, 0.15, 2, 0.08),
+    "lane": (600, 0.35, 1, 0.0),
+}
+FADE_SECONDS = 0.004   # raised-cosine ramp at both ends of each beep to avoid clicks
+AMPLITUDE = 0.9
+
+def tone(frequency, duration, sample_rate=AUDIO_SAMPLE_RATE, fade=FADE_SECONDS):
+    """Float32 sine of ``duration`` seconds in [-1, 1] with faded edges."""
+    n = int(sample_rate * duration)
+    t = np.arange(n, dtype=np.float32) / np.float32(sample_rate)
+    wave = np.sin(np.float32(2 * np.pi * frequency) * t)
+    ramp = min(int(sample_rate * fade), n // 2)
+    if ramp:
+        edge = (0.5 - 0.5 * np.cos(np.linspace(0, np.pi, ramp, dtype=np.float32)))
+        wave[:ramp] *= edge
+        wave[n - ramp:] *= edge[::-1]
+    return wave
+
+def beeps(frequency, duration, count=1, gap=0.0, sample_rate=AUDIO_SAMPLE_RATE):
+    """``count`` beeps separated by ``gap`` seconds of silence."""
+    beep = tone(frequency, duration, sample_rate)
+    if count == 1:
+        return beep
+    silence = np.zeros(int(sample_rate * gap), dtype=np.float32)
+    return np.concatenate([beep] + [np.concatenate([silence, beep]) for _ in range(count - 1)])
+
+def to_pcm16(wave, channels=1, amplitude=AMPLITUDE):
+    """Interleaved little-endian int16 samples of ``wave`` repeated over ``channels``."""
+    pcm = (wave * (amplitude * 32767)).astype('<i2')
+    if channels > 1:
+        pcm = np.repeat(pcm[:, None], channels, axis=1)
+    return np.ascontiguousarray(pcm)
+
+class AlertAudio:
+    """Low-latency alert player with one reserved channel per alert type.
+
+    ``play(name)`` starts the alert on its channel and ducks busy channels of
+    lower priority; ``update()`` (called once per tick) restores their volume
+    when the more urgent alert has finished. Disabled (no mixer) or muted
+    players silently ignore ``play``.
+    """
+
+    def __init__(self, sample_rate=AUDIO_SAMPLE_RATE, buffer=AUDIO_BUFFER, duck_volume=AUDIO_DUCK_VOLUME,
+                 priority=ALERT_PRIORITY, use_files=AUDIO_USE_FILES):
+        self.priority = dict(priority)
+        self.names = sorted(self.priority, key=lambda name: -self.priority[name])
+        self.duck_volume = duck_volume
+        self.sounds = {}
+        self.channels = {}
+        self.muted = False
+        self.played = 0
+        self.ducked = 0
+        self.lock = threading.Lock()
+        self.latency = None
+        try:
+            pygame.mixer.pre_init(sample_rate, -16, 1, buffer)
+            pygame.mixer.init()
+        except pygame.error as e:
+            print(f"⚠ Audio alerts disabled: {e}")
+            return
+        rate, size, channels = pygame.mixer.get_init()
+        # Assumed time for one mixer buffer to reach the device once the channel is playing.
+        self.buffer_delay = buffer / float(rate)
+        pygame.mixer.set_num_channels(max(pygame.mixer.get_num_channels(), len(self.names)))
+        pygame.mixer.set_reserved(len(self.names))
+        for i, name in enumerate(self.names):
+            self.channels[name] = pygame.mixer.Channel(i)
+            path = os.path.join(ASSETS_DIR, f"{name}_warning.wav")
+            if use_files and os.path.exists(path):
+                self.sounds[name] = pygame.mixer.Sound(path)
+            elif name in ALERT_TONES and size == -16:
+                pcm = to_pcm16(beeps(*ALERT_TONES[name], sample_rate=rate), channels)
+                self.sounds[name] = pygame.mixer.Sound(buffer=pcm.tobytes())
+        if size != -16 and not use_files:
+            print(f"⚠ Mixer opened with sample format {size}, expected -16; alert tones not synthesized")
+        source = "files" if use_files else "synthesized"
+        print(f"✓ Audio alerts enabled: {len(self.sounds)}/{len(self.names)} {source} tones, "
+              f"{rate} Hz, {buffer}-sample buffer ({self.buffer_delay * 1000:.1f} ms)")
+
+    @property
+    def enabled(self):
+        return bool(self.sounds)
+
+    def mute(self, muted=True):
+        """Silence (or re-enable) all alerts, e.g. during recording replay."""
+        self.muted = muted
+        if muted:
+            for channel in self.channels.values():
+                channel.stop()
+
+    def play(self, name, triggered=None):
+        """Play alert ``name``; ``triggered`` is the perf_counter() time of the event (default: now)."""
+        sound = self.sounds.get(name)
+        if sound is None or self.muted:
+            return
+        if triggered is None:
+            triggered = time.perf_counter()
+        with self.lock:
+            rank = self.priority[name]
+            louder = any(self.channels[other].get_busy() for other in self.names if self.priority[other] > rank)
+            channel = self.channels[name]
+            channel.set_volume(self.duck_volume if louder else 1.0)
+            channel.play(sound)
+            started = time.perf_counter()
+            for other in self.names:
+                if self.priority[other] < rank and self.channels[other].get_busy():
+                    self.channels[other].set_volume(self.duck_volume)
+                    self.ducked += 1
+            self.played += 1
+        if self.latency is None:
+            from adas_metrics import audio_latency_estimate
+            self.latency = audio_latency_estimate
+        self.latency.record(started - triggered + self.buffer_delay)
+
+    def update(self):
+        """Restore full volume on channels no longer overlapped by a higher-priority alert."""
+        if not self.channels:
+            return
+        with self.lock:
+            louder = False
+            for name in self.names:
+                channel = self.channels[name]
+                if channel.get_busy():
+                    if not louder and channel.get_volume() < 1.0:
+                        channel.set_volume(1.0)
+                    louder = True
+
+    def stats(self):
+        return {"played": self.played, "ducked": self.ducked}
@@ -0,0 +1,387 @@
+#!/usr/bin/env python
+"""
+ADAS Inference Backends
+Interchangeable YOLOv5 runtimes behind one call. Every backend takes a batch
+of images (RGB, or BGR when its ``input_format`` is "bgr") and returns
+per-image ``[x1, y1, x2, y2, conf, cls]`` arrays in the input image's pixel
+coordinates, using the same letterboxing, confidence and IoU thresholds as
+the PyTorch AutoShape model.
+
+Parity check across backends on the ROI crops detection infers, from recorded
+frames (a --record session, or PNG/JPG files / .npy arrays of full camera frames):
+    python src/adas_backends.py --parity recordings/session_X --backends torch direct onnx onnx-int8
+"""
+
+import os
+import sys
+import glob
+import argparse
+import numpy as np
+import cv2
+from adas_config import ASSETS_DIR, INFERENCE_THREADS, DETECTION_INPUT_SIZE, DETECTION_CAMERAS
+
+BACKENDS = ("torch", "direct", "onnx", "onnx-int8")
+STRIDE = 32
+MAX_DET = 1000
+MAX_WH = 7680   # Class offset used for per-class NMS, as in YOLOv5
+
+def inference_threads(workers=None):
+    """Intra-op CPU threads for one inference runtime.
+
+    ``INFERENCE_THREADS`` if set; otherwise the cores split across
+    ``workers`` detection processes, or every core but one (left to the
+    tick loop) when detection runs in the dashboard process.
+    """
+    if INFERENCE_THREADS:
+        return INFERENCE_THREADS
+    cores = os.cpu_count() or 1
+    return max(1, cores // workers if workers else cores - 1)
+
+def _make_divisible(x, divisor):
+    return int(np.ceil(x / divisor) * divisor)
+
+def letterbox_shape(images, size, stride=STRIDE):
+    """Network input ``[h, w]`` AutoShape picks for a batch of images."""
+    shape1 = []
+    for im in images:
+        h, w = im.shape[:2]
+        g = size / max(h, w)
+        shape1.append([int(h * g), int(w * g)])
+    return [_make_divisible(x, stride) for x in np.array(shape1).max(0)]
+
+def letterbox_placement(shape0, shape1):
+    """Resized ``(w, h)`` of an image in the input and its ``(top, left)`` padding, as in AutoShape."""
+    h, w = shape0[:2]
+    r = min(shape1[0] / h, shape1[1] / w)
+    new_unpad = int(round(w * r)), int(round(h * r))
+    dw, dh = (shape1[1] - new_unpad[0]) / 2, (shape1[0] - new_unpad[1]) / 2
+    return new_unpad, int(round(dh - 0.1)), int(round(dw - 0.1))
+
+def letterbox_batch(images, size, stride=STRIDE):
+    """Letterbox a batch exactly like YOLOv5 AutoShape; returns (NCHW float32 batch, input shape)."""
+    shape1 = letterbox_shape(images, size, stride)
+    batch = np.empty((len(images), 3, shape1[0], shape1[1]), dtype=np.float32)
+    for i, im in enumerate(images):
+        h, w = im.shape[:2]
+        new_unpad, top, left = letterbox_placement(im.shape, shape1)
+        if (w, h) != new_unpad:
+            im = cv2.resize(im, new_unpad, interpolation=cv2.INTER_LINEAR)
+        bottom, right = shape1[0] - new_unpad[1] - top, shape1[1] - new_unpad[0] - left
+        im = cv2.copyMakeBorder(im, top, bottom, left, right, cv2.BORDER_CONSTANT, value=(114, 114, 114))
+        np.multiply(im.transpose(2, 0, 1), 1 / 255.0, out=batch[i], casting="unsafe")
+    return batch, shape1
+
+def nms(boxes, scores, iou_thres):
+    """Greedy non-maximum suppression; returns kept indices in descending score order."""
+    x1, y1, x2, y2 = boxes[:, 0], boxes[:, 1], boxes[:, 2], boxes[:, 3]
+    areas = (x2 - x1) * (y2 - y1)
+    order = scores.argsort()[::-1]
+    keep = []
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        xx1 = np.maximum(x1[i], x1[order[1:]])
+        yy1 = np.maximum(y1[i], y1[order[1:]])
+        xx2 = np.minimum(x2[i], x2[order[1:]])
+        yy2 = np.minimum(y2[i], y2[order[1:]])
+        inter = np.maximum(0.0, xx2 - xx1) * np.maximum(0.0, yy2 - yy1)
+        iou = inter / (areas[i] + areas[order[1:]] - inter + 1e-9)
+        order = order[1:][iou <= iou_thres]
+    return np.array(keep, dtype=np.int64)
+
+def postprocess(prediction, input_shape, image_shapes, conf_thres, iou_thres, classes=None):
+    """YOLOv5 NMS on raw ``(B, N, 5 + nc)`` output, boxes mapped back to each image."""
+    results = []
+    for pred, shape0 in zip(prediction, image_shapes):
+        pred = pred[pred[:, 4] > conf_thres]
+        if not len(pred):
+            results.append(np.zeros((0, 6), dtype=np.float32))
+            continue
+        cls_scores = pred[:, 5:] * pred[:, 4:5]
+        cls_ids = cls_scores.argmax(1)
+        conf = cls_scores[np.arange(len(pred)), cls_ids]
+        xy, wh = pred[:, :2], pred[:, 2:4] / 2
+        det = np.concatenate([xy - wh, xy + wh, conf[:, None], cls_ids[:, None]], axis=1)
+        det = det[conf > conf_thres]
+        if classes is not None:
+            det = det[np.isin(det[:, 5], classes)]
+        if len(det):
+            keep = nms(det[:, :4] + det[:, 5:6] * MAX_WH, det[:, 4], iou_thres)[:MAX_DET]
+            det = det[keep]
+            gain = min(input_shape[0] / shape0[0], input_shape[1] / shape0[1])
+            det[:, [0, 2]] -= (input_shape[1] - shape0[1] * gain) / 2
+            det[:, [1, 3]] -= (input_shape[0] - shape0[0] * gain) / 2
+            det[:, :4] /= gain
+            det[:, [0, 2]] = det[:, [0, 2]].clip(0, shape0[1])
+            det[:, [1, 3]] = det[:, [1, 3]].clip(0, shape0[0])
+        results.append(det.astype(np.float32))
+    return results
+
+class TorchBackend:
+    """PyTorch eager inference through the YOLOv5 AutoShape wrapper."""
+
+    name = "torch"
+    input_format = "rgb"
+
+    def __init__(self, model):
+        self.model = model
+        self.names = model.names
+
+    def infer(self, images, size=DETECTION_INPUT_SIZE):
+        results = self.model(list(images), size=size)
+        return [d.cpu().numpy() for d in results.xyxy]
+
+class DirectTorchBackend:
+    """PyTorch inference on the bare network, bypassing AutoShape.
+
+    Takes BGR frames (e.g. ROI views of the camera buffers) and writes each
+    one into a preallocated NCHW input tensor in a single pass per image:
+    one resize into a reused scratch image, then the BGR->RGB swap, HWC->CHW
+    transpose and 1/255 scaling as one strided NumPy write into the tensor's
+    memory. Only the padding strips are refilled. The network runs under
+    ``torch.inference_mode()`` and its raw output goes through the shared
+    ``postprocess`` NMS, so results match the AutoShape path.
+    """
+
+    name = "direct"
+    input_format = "bgr"
+
+    def __init__(self, model, threads=None):
+        import torch
+        self.torch = torch
+        self.model = model
+        self.names = model.names
+        self.net = _raw_network(model).eval()
+        self.dtype = next(self.net.parameters()).dtype
+        torch.set_num_threads(inference_threads() if threads is None else threads)
+        try:
+            torch.set_num_interop_threads(1)   # one graph at a time; intra-op threads do the work
+        except RuntimeError:
+            pass   # already fixed once any parallel work has run
+        self.inputs = {}
+        self.scratch = {}
+
+    def _input(self, n, shape1):
+        key = (n, shape1[0], shape1[1])
+        if key not in self.inputs:
+            batch = np.empty((n, 3, shape1[0], shape1[1]), dtype=np.float32)
+            self.inputs[key] = (batch, self.torch.from_numpy(batch))
+        return self.inputs[key]
+
+    def _resized(self, im, new_unpad):
+        w, h = new_unpad
+        if im.shape[:2] == (h, w):
+            return im
+        if (w, h) not in self.scratch:
+            self.scratch[(w, h)] = np.empty((h, w, 3), dtype=np.uint8)
+        return cv2.resize(im, new_unpad, dst=self.scratch[(w, h)], interpolation=cv2.INTER_LINEAR)
+
+    def infer(self, images, size=DETECTION_INPUT_SIZE):
+        images = list(images)
+        shape1 = letterbox_shape(images, size)
+        batch, tensor = self._input(len(images), shape1)
+        pad = 114 / 255.0
+        for i, im in enumerate(images):
+            (w, h), top, left = letterbox_placement(im.shape, shape1)
+            out = batch[i]
+            out[:, :top] = pad
+            out[:, top + h:] = pad
+            out[:, top:top + h, :left] = pad
+            out[:, top:top + h, left + w:] = pad
+            resized = self._resized(im, (w, h))
+            np.multiply(resized[:, :, ::-1].transpose(2, 0, 1), np.float32(1 / 255.0),
+                        out=out[:, top:top + h, left:left + w], casting="unsafe")
+        with self.torch.inference_mode():
+            x = tensor if self.dtype == self.torch.float32 else tensor.to(self.dtype)
+            prediction = self.net(x)
+            if isinstance(prediction, (list, tuple)):
+                prediction = prediction[0]
+            prediction = prediction.float().numpy()
+        return postprocess(prediction, shape1, [im.shape[:2] for im in images],
+                           self.model.conf, self.model.iou, getattr(self.model, "classes", None))
+
+class OnnxBackend:
+    """ONNX Runtime inference on an exported copy of the model (optionally INT8-quantized)."""
+
+    input_format = "rgb"
+
+    def __init__(self, model, quantized=False):
+        import onnxruntime as ort
+        self.name = "onnx-int8" if quantized else "onnx"
+        self.names = model.names
+        self.model = model
+        path = export_onnx(model)
+        if quantized:
+            path = quantize_onnx(path)
+        options = ort.SessionOptions()
+        options.intra_op_num_threads = inference_threads()
+        self.session = ort.InferenceSession(path, options, providers=["CPUExecutionProvider"])
+        self.input_name = self.session.get_inputs()[0].name
+
+    def infer(self, images, size=DETECTION_INPUT_SIZE):
+        images = list(images)
+        batch, input_shape = letterbox_batch(images, size)
+        prediction = self.session.run(None, {self.input_name: batch})[0]
+        return postprocess(prediction, input_shape, [im.shape[:2] for im in images],
+                           self.model.conf, self.model.iou, getattr(self.model, "classes", None))
+
+def _raw_network(model):
+    """Return the bare nn.Module inside an AutoShape/DetectMultiBackend wrapper."""
+    net = model.model if type(model).__name__ == "AutoShape" else model
+    if type(net).__name__ == "DetectMultiBackend":
+        net = net.model
+    return net
+
+def export_onnx(model, path=None, opset=12):
+    """Export the network to ONNX (batch and image size dynamic); reuses an existing file."""
+    import torch
+    path = path or os.path.join(ASSETS_DIR, "yolov5n.onnx")
+    if os.path.exists(path):
+        return path
+    print(f"Exporting ONNX model to {path}...")
+    net = _raw_network(model).float().eval()
+    detect_layers = [m for m in net.modules() if type(m).__name__ == "Detect"]
+    saved = [(m.inplace, getattr(m, "dynamic", False)) for m in detect_layers]
+    for m in detect_layers:
+        m.inplace = False
+        m.dynamic = True   # rebuild the anchor grid for each input size instead of baking in the export size
+        m.export = True
+    dummy = torch.zeros(1, 3, DETECTION_INPUT_SIZE, DETECTION_INPUT_SIZE)
+    try:
+        torch.onnx.export(net, dummy, path, opset_version=opset, input_names=["images"],
+                          output_names=["output"],
+                          dynamic_axes={"images": {0: "batch", 2: "height", 3: "width"},
+                                        "output": {0: "batch", 1: "anchors"}})
+    finally:
+        for m, (inplace, dynamic) in zip(detect_layers, saved):
+            m.inplace = inplace
+            m.dynamic = dynamic
+            m.export = False
+    return path
+
+def quantize_onnx(path):
+    """Write a dynamic INT8-quantized copy of an ONNX model next to it; reuses an existing file."""
+    from onnxruntime.quantization import quantize_dynamic, QuantType
+    out = os.path.splitext(path)[0] + ".int8.onnx"
+    if not os.path.exists(out):
+        print(f"Quantizing ONNX model to {out}...")
+        quantize_dynamic(path, out, weight_type=QuantType.QUInt8)
+    return out
+
+def create_backend(name, model):
+    """Build the named inference backend around a loaded AutoShape model."""
+    if name == "torch":
+        return TorchBackend(model)
+    if name == "direct":
+        return DirectTorchBackend(model)
+    if name == "onnx":
+        return OnnxBackend(model)
+    if name == "onnx-int8":
+        return OnnxBackend(model, quantized=True)
+    raise ValueError(f"Unknown detection backend '{name}' (expected one of {', '.join(BACKENDS)})")
+
+def _box_iou(a, b):
+    tl = np.maximum(a[:, None, :2], b[None, :, :2])
+    br = np.minimum(a[:, None, 2:4], b[None, :, 2:4])
+    inter = np.prod(np.clip(br - tl, 0, None), axis=2)
+    area_a = np.prod(a[:, 2:4] - a[:, :2], axis=1)
+    area_b = np.prod(b[:, 2:4] - b[:, :2], axis=1)
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+def as_input(rgb, backend):
+    """An RGB frame in the channel order ``backend`` expects."""
+    if getattr(backend, "input_format", "rgb") == "bgr":
+        return np.ascontiguousarray(rgb[:, :, ::-1])
+    return rgb
+
+def compare_backends(frames, reference, candidate, size=DETECTION_INPUT_SIZE, match_iou=0.5):
+    """Match ``candidate`` detections to ``reference`` ones frame by frame.
+
+    A detection matches when the class agrees and the boxes overlap by at
+    least ``match_iou``. Returns counts of matched/missed/extra detections
+    and the largest confidence and box-corner differences among matches.
+    """
+    stats = {"frames": 0, "reference": 0, "candidate": 0, "matched": 0,
+             "max_conf_diff": 0.0, "max_box_diff": 0.0}
+    for frame in frames:
+        ref = reference.infer([as_input(frame, reference)], size)[0]
+        cand = candidate.infer([as_input(frame, candidate)], size)[0]
+        stats["frames"] += 1
+        stats["reference"] += len(ref)
+        stats["candidate"] += len(cand)
+        if not len(ref) or not len(cand):
+            continue
+        iou = _box_iou(ref, cand)
+        iou[ref[:, 5][:, None] != cand[:, 5][None, :]] = 0
+        used = set()
+        for i in np.argsort(-ref[:, 4]):
+            j = int(np.argmax(iou[i]))
+            if iou[i, j] < match_iou or j in used:
+                continue
+            used.add(j)
+            stats["matched"] += 1
+            stats["max_conf_diff"] = max(stats["max_conf_diff"], float(abs(ref[i, 4] - cand[j, 4])))
+            stats["max_box_diff"] = max(stats["max_box_diff"], float(np.abs(ref[i, :4] - cand[j, :4]).max()))
+    return stats
+
+def load_frames(path, sides=DETECTION_CAMERAS, limit=None):
+    """Load recorded BGR camera frames and crop them as detection does; returns RGB ROI crops.
+
+    ``path`` is a ``--record`` session (each side's frames cropped to that
+    side's ROI, at most ``limit`` per side) or a directory of full-size
+    images / ``.npy`` arrays, each cropped for every side in ``sides``.
+    """
+    from adas_utils import crop_for_detection
+    if os.path.exists(os.path.join(path, "session.json")):
+        from adas_recorder import Recording
+        recording = Recording(path)
+        return [crop_for_detection(frame, side)[0] for side in sides if side in recording.sides
+                for frame in recording.frames[side][:limit]]
+    frames = []
+    for file in sorted(glob.glob(os.path.join(path, "*"))):
+        ext = os.path.splitext(file)[1].lower()
+        if ext in (".png", ".jpg", ".jpeg", ".bmp"):
+            images = [cv2.imread(file)]
+        elif ext == ".npy":
+            arr = np.load(file)
+            images = list(arr) if arr.ndim == 4 else [arr]
+        else:
+            continue
+        for im in images[:limit]:
+            frames.extend(crop_for_detection(im, side)[0] for side in sides)
+    return frames
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare detections across inference backends")
+    parser.add_argument("--parity", required=True, metavar="DIR",
+                        help="--record session or directory of recorded camera frames")
+    parser.add_argument("--sides", nargs="+", default=list(DETECTION_CAMERAS),
+                        choices=["left", "right", "front", "rear"], help="camera ROIs to compare on")
+    parser.add_argument("--limit", type=int, default=None, help="max frames per side (or per file)")
+    parser.add_argument("--backends", nargs="+", default=["torch", "onnx"], choices=BACKENDS,
+                        help="first backend is the reference")
+    parser.add_argument("--conf-tol", type=float, default=0.02, help="allowed confidence difference")
+    parser.add_argument("--box-tol", type=float, default=2.0, help="allowed box difference in pixels")
+    args = parser.parse_args()
+    from adas_config import load_model
+    model = load_model()
+    frames = load_frames(args.parity, args.sides, args.limit)
+    if not frames:
+        print(f"No frames found in {args.parity}")
+        return 1
+    backends = [create_backend(name, model) for name in args.backends]
+    failed = False
+    for backend in backends[1:]:
+        s = compare_backends(frames, backends[0], backend)
+        ok = (s["matched"] == s["reference"] == s["candidate"] and
+              s["max_conf_diff"] <= args.conf_tol and s["max_box_diff"] <= args.box_tol)
+        print(f"{backends[0].name} vs {backend.name}: {s['matched']}/{s['reference']} matched, "
+              f"{s['candidate']} candidate detections over {s['frames']} frames, "
+              f"max conf diff {s['max_conf_diff']:.4f}, max box diff {s['max_box_diff']:.2f}px "
+              f"-> {'OK' if ok else 'MISMATCH'}")
+        if backend.name != "onnx-int8":
+            failed = failed or not ok
+    return 1 if failed else 0
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,167 @@
+#!/usr/bin/env python
+"""
+ADAS Camera Frame Buffers
+Preallocated multi-slot frame storage filled directly by CARLA sensor callbacks,
+optionally placed in shared memory so detection processes can read it.
+"""
+
+import os
+import time
+import threading
+import collections
+import numpy as np
+import cv2
+from adas_config import CAMERA_WIDTH, CAMERA_HEIGHT, CAMERA_BUFFER_SLOTS
+
+# A consistent read of one buffer: the frame view, its write count, the
+# perf_counter() time at which the camera callback delivered it, and CARLA's
+# simulation frame id and timestamp for that image.
+FrameRef = collections.namedtuple("FrameRef", ["frame", "count", "captured", "frame_id", "timestamp"])
+
+HEADER_BYTES = 16   # int64 latest slot, int64 write count
+SLOT_META_BYTES = 24  # per slot: float64 captured, int64 frame id, float64 sim timestamp
+
+def untrack_shared_memory(shm):
+    """Stop this process's resource tracker from unlinking a segment it only attached to."""
+    if os.name == "posix":
+        from multiprocessing import resource_tracker
+        try:
+            resource_tracker.unregister(shm._name, "shared_memory")
+        except Exception:
+            pass
+
+class FrameBuffer:
+    """Ring of preallocated BGR frames; each camera callback converts into the next slot.
+
+    Readers get a view of the most recently completed slot via ``frame``. That
+    view is not copied and stays unchanged for the next ``slots - 1`` writes,
+    so a reader must finish with it (or copy it) within that window.
+
+    Every slot carries the CARLA ``image.frame`` id and sensor timestamp, so
+    readers can skip frames they have already processed and
+    ``wait_for_frame`` can block until a given simulation tick has arrived.
+
+    With ``shared=True`` the ring lives in a ``multiprocessing.shared_memory``
+    block (Python 3.8+); ``spec`` describes it and ``FrameBuffer.attach(spec)``
+    maps the same frames in another process.
+    """
+
+    def __init__(self, width=CAMERA_WIDTH, height=CAMERA_HEIGHT, slots=CAMERA_BUFFER_SLOTS, shared=False,
+                 _shm=None):
+        self.slots = max(2, int(slots))
+        self.width, self.height = width, height
+        self.shm = _shm
+        self.owner = False
+        self.cond = threading.Condition()
+        if shared and _shm is None:
+            from multiprocessing import shared_memory
+            size = HEADER_BYTES + SLOT_META_BYTES * self.slots + self.slots * height * width * 3
+            self.shm = shared_memory.SharedMemory(create=True, size=size)
+            self.owner = True
+        if self.shm is None:
+            self.header = np.array([-1, 0], dtype=np.int64)
+            self.captured = np.zeros(self.slots)
+            self.frame_ids = np.full(self.slots, -1, dtype=np.int64)
+            self.timestamps = np.zeros(self.slots)
+            self.frames = np.zeros((self.slots, height, width, 3), dtype=np.uint8)
+        else:
+            buf = self.shm.buf
+            self.header = np.ndarray((2,), dtype=np.int64, buffer=buf)
+            offset = HEADER_BYTES
+            self.captured = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=offset)
+            offset += 8 * self.slots
+            self.frame_ids = np.ndarray((self.slots,), dtype=np.int64, buffer=buf, offset=offset)
+            offset += 8 * self.slots
+            self.timestamps = np.ndarray((self.slots,), dtype=np.float64, buffer=buf, offset=offset)
+            self.frames = np.ndarray((self.slots, height, width, 3), dtype=np.uint8, buffer=buf,
+                                     offset=HEADER_BYTES + SLOT_META_BYTES * self.slots)
+            if self.owner:
+                self.header[:] = (-1, 0)
+                self.frame_ids[:] = -1
+
+    @property
+    def spec(self):
+        """Picklable description of a shared buffer for ``attach``."""
+        return (self.shm.name, self.width, self.height, self.slots)
+
+    @classmethod
+    def attach(cls, spec, track=True):
+        """Map a shared buffer created in another process.
+
+        Pass ``track=False`` from processes not started by the creator, so
+        their exit does not unlink the creator's segment.
+        """
+        from multiprocessing import shared_memory
+        name, width, height, slots = spec
+        shm = shared_memory.SharedMemory(name=name)
+        if not track:
+            untrack_shared_memory(shm)
+        return cls(width, height, slots, _shm=shm)
+
+    @property
+    def latest(self):
+        return int(self.header[0])
+
+    @property
+    def count(self):
+        return int(self.header[1])
+
+    @property
+    def frame_id(self):
+        """CARLA frame id of the newest image, or -1 before the first one."""
+        latest = self.latest
+        return int(self.frame_ids[latest]) if latest >= 0 else -1
+
+    def write(self, image):
+        """Sensor callback: convert a CARLA BGRA image into the next free slot."""
+        captured = time.perf_counter()
+        if self.frames.shape[1:3] != (image.height, image.width):
+            if self.shm is not None:
+                return
+            self.frames = np.zeros((self.slots, image.height, image.width, 3), dtype=np.uint8)
+        bgra = np.frombuffer(image.raw_data, dtype=np.uint8).reshape((image.height, image.width, 4))
+        count = int(self.header[1])
+        slot = count % self.slots
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self.frames[slot])
+        self.captured[slot] = captured
+        self.frame_ids[slot] = image.frame
+        self.timestamps[slot] = image.timestamp
+        with self.cond:
+            self.header[0] = slot
+            self.header[1] = count + 1
+            self.cond.notify_all()
+
+    def wait_for_frame(self, frame_id, timeout):
+        """Block until an image of simulation frame ``frame_id`` or later arrives; False on timeout.
+
+        Only writes made in this process wake the waiter.
+        """
+        with self.cond:
+            return self.cond.wait_for(lambda: self.frame_id >= frame_id, timeout)
+
+    @property
+    def frame(self):
+        """View of the newest frame, or None before the first image arrives."""
+        latest = self.latest
+        if latest < 0:
+            return None
+        return self.frames[latest]
+
+    def read(self):
+        """Return a FrameRef for the newest frame (frame is None before the first image)."""
+        count = self.count
+        latest = self.latest
+        if latest < 0:
+            return FrameRef(None, 0, 0.0, -1, 0.0)
+        return FrameRef(self.frames[latest], count, self.captured[latest], int(self.frame_ids[latest]),
+                        self.timestamps[latest])
+
+    def close(self):
+        """Release shared memory (and unlink it if this process created it)."""
+        if self.shm is None:
+            return
+        self.header = self.captured = self.frame_ids = self.timestamps = self.frames = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+        self.shm = None
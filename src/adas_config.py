@@ -1,19 +1,21 @@
 #!/usr/bin/env python
 """
 ADAS Configuration and Initialization
-Contains all configuration constants, model loading, and audio setup.
+Contains all configuration constants and the lazy model, audio and log setup.
 """
 
 import os
-import csv
-import datetime
-import torch
+import time
+import concurrent.futures
+import numpy as np
 import pygame
+from adas_logging import DetectionLogger
 
 # Get project root directory
 PROJECT_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
 LOGS_DIR = os.path.join(PROJECT_ROOT, "logs")
 ASSETS_DIR = os.path.join(PROJECT_ROOT, "assets")
+RECORDINGS_DIR = os.path.join(PROJECT_ROOT, "recordings")  # Created on first --record
 
 # Create directories if they don't exist
 os.makedirs(LOGS_DIR, exist_ok=True)
@@ -25,47 +27,234 @@ TARGET_FPS = 30
 WARNING_CLEAR_TIME = 0.5
 VEHICLE_KEYWORDS = ("car", "truck", "bus")
 
-# YOLOv5 Model
-print("Loading YOLOv5 model...")
-model = torch.hub.load('ultralytics/yolov5:v7.0', 'yolov5n',
-                       pretrained=True, trust_repo=True)
-model.conf = 0.30
-model.iou = 0.45
-print("Model loaded!")
-
-# CSV logging
-log_filename = os.path.join(LOGS_DIR, f"detections_{datetime.datetime.now().strftime('%Y%m%d_%H%M%S')}.csv")
-log_file = open(log_filename, "w", newline="")
-writer = csv.writer(log_file)
-writer.writerow(["time", "vehicle_detected", "confidence", "side",
-                 "alert_level", "lane_departure", "distance_m", "rel_speed_mps"])
-print(f"Logging to: {log_filename}")
-
-# Audio System
-pygame.init()
-audio_alerts = {
-    "blindspot": None,
-    "proximity": None,
-    "lane": None,
+# Logging settings
+LOG_QUEUE_SIZE = 10000          # Records buffered before new ones are dropped
+LOG_BATCH_SIZE = 256            # Records written per batch
+LOG_FLUSH_INTERVAL = 0.5        # seconds between flushes of a partial batch
+LOG_MAX_BYTES = 50 * 1024 * 1024  # Rotate the log file after this size (0 = never)
+LOG_MAX_SECONDS = 0             # Rotate the log file after this long (0 = never)
+LOG_BINARY = False              # Also write a binary .rec record stream next to each CSV
+
+# Proximity settings
+PROXIMITY_WARN_DISTANCE = 8     # meters
+PROXIMITY_NEAR_DISTANCE = 15    # meters
+PROXIMITY_CONE_DEG = 60         # Forward cone used for ahead-distance and time-to-collision
+
+# Camera settings
+CAMERA_WIDTH = 320
+CAMERA_HEIGHT = 240
+CAMERA_BUFFER_SLOTS = 3     # Preallocated frames per camera (triple buffering)
+CAMERA_SYNC_WAIT = False    # After world.tick(), wait until every camera has delivered that frame
+CAMERA_SYNC_TIMEOUT = 0.1   # Max seconds to wait per tick for camera frames when CAMERA_SYNC_WAIT is on
+CAMERA_PANEL_LAYOUT = "2x2" # Camera window grid as "ROWSxCOLS" (e.g. "1x4"), or "auto"
+CAMERA_TILE_SIZE = (320, 240)
+
+# Display window (HUD and camera panel composited into one pygame window)
+DISPLAY_FPS = 30            # Window refreshes per second, independent of the simulation tick (0 = every tick)
+DISPLAY_HEADLESS = False    # Render into an offscreen canvas without opening a window (tests, benchmarks)
+
+# Blind-spot regions of interest as (x0, y0, x1, y1) fractions of the mirror frame.
+# Only this crop is sent to the detector; it must contain the alert zone
+# (0.05-0.35 of the width on the left, 0.65-0.95 on the right). None = whole frame.
+BLINDSPOT_ROI = {
+    "left": (0.0, 0.0, 0.45, 1.0),
+    "right": (0.55, 0.0, 1.0, 1.0),
 }
 
-try:
-    pygame.mixer.init()
-    sound_files = {
-        "blindspot": "blindspot_warning.wav",
-        "proximity": "proximity_warning.wav",
-        "lane": "lane_warning.wav",
-    }
-    sounds_loaded = 0
-    for alert_type, filename in sound_files.items():
-        sound_path = os.path.join(ASSETS_DIR, filename)
-        if os.path.exists(sound_path):
-            audio_alerts[alert_type] = pygame.mixer.Sound(sound_path)
-            sounds_loaded += 1
-    if sounds_loaded > 0:
-        print(f"Audio alerts enabled: {sounds_loaded}/3 warning sounds loaded")
-    else:
-        print("Audio alerts disabled (no warning sound files found in assets/)")
-        print("  Expected files: blindspot_warning.wav, proximity_warning.wav, lane_warning.wav")
-except Exception as e:
-    print(f"Audio initialization failed: {e}")
+# Adaptive detection scheduling
+ADAPTIVE_DETECTION = True   # Vary each camera's detection interval; False = every DETECTION_SKIP_FRAMES ticks
+DETECTION_MIN_INTERVAL = 1  # ticks (hard limit, used while a side is alerting or steered toward)
+DETECTION_MAX_INTERVAL = 15 # ticks (hard limit, used while parked)
+SCHED_PARKED_KPH = 3        # Below this speed the mirrors are checked at the max interval
+SCHED_HIGHWAY_KPH = 60      # Above this speed the interval is shortened by one tick
+SCHED_STEER_THRESHOLD = 0.1 # Steering input toward a side that counts as a lane change
+SCHED_IDLE_SECONDS = 3.0    # A side clear for this long is checked half as often
+DETECTION_BUDGET_FRACTION = 0.5  # Share of the 1/TARGET_FPS tick budget inference may use on average
+
+# Blind-spot tracking
+BLINDSPOT_TRACKING = True   # Alert from Kalman-tracked boxes that are predicted between detections
+TRACK_IOU_THRESHOLD = 0.3   # Minimum IoU to match a detection to an existing track
+TRACK_MAX_AGE = 0.5         # seconds a track is kept (predicted) without a matching detection
+TRACK_APPROACH_RATE = 0.5   # Box-height growth per second (fraction of height) treated as approaching -> warn
+
+# Motion gating
+MOTION_GATING = True        # Reuse the last detection result while a mirror ROI is unchanged
+MOTION_THRESHOLD = 4.0      # Mean absolute grayscale difference (0-255) that counts as change
+MOTION_MAX_REUSE_AGE = 1.0  # Seconds a result may be reused before inference is forced
+MOTION_THUMB_SIZE = (32, 24)  # Downsampled ROI size (w, h) compared between frames
+
+# Telemetry bus
+TELEMETRY_ENABLED = False   # Publish ADAS state to shared memory every tick for other processes
+TELEMETRY_NAME = "adas_telemetry"  # Shared-memory segment name readers attach to
+TELEMETRY_FRAMES = False    # Also share the camera frame buffers with telemetry readers
+
+# Recording settings
+RECORD_MAX_FRAMES = 6000    # Frames preallocated per camera (5 minutes at 20 Hz)
+
+# Performance instrumentation
+PERF_WINDOW = 600           # Frames (and latency samples) kept for rolling percentiles
+PERF_OVERLAY = False        # Draw stage timings on the HUD
+PERF_OVERLAY_INTERVAL = 0.5 # seconds between overlay refreshes
+PERF_DUMP_INTERVAL = 10.0   # seconds between perf_*.csv dumps in logs/ (0 = off)
+
+# Detection worker settings
+DETECTION_MODE = "thread"   # "inline" (tick loop), "thread" (background thread) or "process" (worker pool, Python 3.8+)
+DETECTION_CAMERAS = ("left", "right")  # Cameras run through detection; add "front"/"rear" with "process"
+DETECTION_QUEUE_DEPTH = 1   # Pending detection requests kept before the oldest is dropped
+DETECTION_WORKERS = 2       # Worker processes in "process" mode
+DETECTION_ASSIGNMENT = None # Camera -> worker index, e.g. {"left": 0, "right": 1}; None = round-robin
+ENGINE_MAX_DETECTIONS = 100 # Boxes per camera kept in the shared results buffer
+
+# YOLOv5 Model
+MODEL_PATH = os.path.join(ASSETS_DIR, "yolov5n.pt")
+MODEL_CONF = 0.30
+MODEL_IOU = 0.45
+MODEL_WARMUP_RUNS = 2       # Dummy inferences run at startup so the first real one is not slow
+DETECTION_INPUT_SIZE = 160
+DETECTION_BACKEND = "torch" # "torch", "direct" (fused preprocessing, no AutoShape), "onnx" or "onnx-int8"
+INFERENCE_THREADS = 0       # Intra-op CPU threads for inference (0 = cores split across detection processes)
+
+# Alert audio
+AUDIO_SAMPLE_RATE = 44100
+AUDIO_BUFFER = 256          # Mixer buffer in samples (~6 ms at 44.1 kHz); smaller = lower output latency
+AUDIO_DUCK_VOLUME = 0.3     # Volume of an alert while a higher-priority one is sounding
+AUDIO_USE_FILES = False     # Load assets/*_warning.wav instead of synthesizing the tones
+ALERT_PRIORITY = {"proximity": 3, "blindspot": 2, "lane": 1}
+
+# Lazily initialized services. start_services() kicks off model loading,
+# audio and log setup on background threads so they overlap with the CARLA
+# connection; get_model()/get_logger() block until the service is ready.
+# In "process" detection mode the workers load their own models, so the
+# model and backend are only loaded here on demand (e.g. inline fallback).
+_executor = None
+_services = {}
+startup_timings = {}
+
+def _timed(phase, func):
+    def run():
+        start = time.perf_counter()
+        try:
+            return func()
+        finally:
+            startup_timings[phase] = time.perf_counter() - start
+    return run
+
+def record_startup_phase(phase, seconds):
+    """Record the duration of a startup phase that ran outside start_services()."""
+    startup_timings[phase] = seconds
+
+def vehicle_class_ids(names):
+    """Class ids whose model name contains one of VEHICLE_KEYWORDS."""
+    items = names.items() if isinstance(names, dict) else enumerate(names)
+    return sorted(int(i) for i, name in items if any(k in name.lower() for k in VEHICLE_KEYWORDS))
+
+def load_model():
+    """Load YOLOv5n from the bundled weights without network access."""
+    print("Loading YOLOv5 model...")
+    try:
+        import yolov5
+        model = yolov5.load(MODEL_PATH)
+    except ImportError:
+        import torch
+        hub_repo = os.path.join(torch.hub.get_dir(), "ultralytics_yolov5_v7.0")
+        if not os.path.isdir(hub_repo):
+            raise RuntimeError("YOLOv5 code not found offline; install the 'yolov5' package "
+                               "(pip install -r requirements.txt)")
+        model = torch.hub.load(hub_repo, 'custom', path=MODEL_PATH, source='local')
+    model.conf = MODEL_CONF
+    model.iou = MODEL_IOU
+    model.classes = vehicle_class_ids(model.names)  # NMS only keeps vehicle classes
+    print("Model loaded!")
+    return model
+
+def load_backend():
+    """Build the configured inference backend and warm it up."""
+    from adas_backends import create_backend
+    backend = create_backend(DETECTION_BACKEND, get_model())
+    print(f"Detection backend: {backend.name}")
+    start = time.perf_counter()
+    warm_up_backend(backend)
+    startup_timings["model_warmup"] = time.perf_counter() - start
+    return backend
+
+def warm_up_backend(backend, sides=DETECTION_CAMERAS):
+    """Run ``backend`` on blank ROI crops of ``sides`` so per-shape buffers exist before the first real frame."""
+    from adas_utils import crop_for_detection
+    # Warm up on the crops detection actually sees, as the full batch and one camera at a time.
+    blank = np.zeros((CAMERA_HEIGHT, CAMERA_WIDTH, 3), dtype=np.uint8)
+    rgb = getattr(backend, "input_format", "rgb") == "rgb"
+    crops = [crop_for_detection(blank, side, rgb)[0] for side in sides]
+    for _ in range(MODEL_WARMUP_RUNS):
+        backend.infer(crops, DETECTION_INPUT_SIZE)
+        if len(crops) > 1:
+            for crop in crops:
+                backend.infer([crop], DETECTION_INPUT_SIZE)
+
+def open_logger():
+    """Create the background detection logger."""
+    logger = DetectionLogger(LOGS_DIR, max_bytes=LOG_MAX_BYTES, max_seconds=LOG_MAX_SECONDS,
+                             queue_size=LOG_QUEUE_SIZE, batch_size=LOG_BATCH_SIZE,
+                             flush_interval=LOG_FLUSH_INTERVAL, binary=LOG_BINARY)
+    print(f"Logging to: {logger.csv_path}")
+    return logger
+
+def init_audio():
+    """Open the mixer and prepare the alert tones; returns an ``AlertAudio``."""
+    from adas_audio import AlertAudio
+    return AlertAudio()
+
+def start_services():
+    """Start model, audio and log initialization in the background (idempotent)."""
+    global _executor
+    if _executor is not None:
+        return
+    pygame.display.init()
+    _executor = concurrent.futures.ThreadPoolExecutor(max_workers=4, thread_name_prefix="startup")
+    if DETECTION_MODE != "process":
+        _services["model"] = _executor.submit(_timed("model_load", load_model))
+        _services["backend"] = _executor.submit(_timed("backend_init", load_backend))
+    _services["audio"] = _executor.submit(_timed("audio_init", init_audio))
+    _services["logger"] = _executor.submit(_timed("log_open", open_logger))
+
+def wait_for_services():
+    """Block until every background service is ready; re-raises initialization errors."""
+    start_services()
+    for future in _services.values():
+        future.result()
+    _executor.shutdown(wait=False)
+
+def _on_demand(name, phase, func):
+    """Result of service ``name``, loading it on the calling thread if start_services() skipped it."""
+    start_services()
+    if name not in _services:
+        future = concurrent.futures.Future()
+        try:
+            future.set_result(_timed(phase, func)())
+        except Exception as e:
+            future.set_exception(e)
+        _services[name] = future
+    return _services[name].result()
+
+def get_model():
+    """Return the YOLOv5 model, starting or waiting for its load if needed."""
+    return _on_demand("model", "model_load", load_model)
+
+def get_backend():
+    """Return the warmed-up inference backend, starting or waiting for it if needed."""
+    return _on_demand("backend", "backend_init", load_backend)
+
+def get_logger():
+    """Return the detection logger, starting or waiting for it if needed."""
+    start_services()
+    return _services["logger"].result()
+
+def get_audio():
+    """Return the alert audio player, starting or waiting for it if needed."""
+    start_services()
+    return _services["audio"].result()
+
+def print_startup_report():
+    """Print how long each startup phase took."""
+    print("Startup timing:")
+    for phase, seconds in sorted(startup_timings.items(), key=lambda item: -item[1]):
+        print(f"  {phase:<16} {seconds * 1000:8.1f} ms")
@@ -0,0 +1,98 @@
+#!/usr/bin/env python
+"""
+ADAS Display
+Single-window compositor for the HUD and the camera panel. Both renderers
+draw straight into their region of one preallocated BGR canvas; the window
+blits from a pygame surface that wraps the canvas memory
+(``pygame.image.frombuffer``), and only regions that changed are pushed to
+the screen. Presentation is paced by ``DISPLAY_FPS`` independently of the
+simulation tick. In headless mode no window is opened and the canvas is
+the output, for tests, benchmarks and recording replay.
+"""
+
+import time
+import numpy as np
+import pygame
+from adas_config import DISPLAY_FPS, DISPLAY_HEADLESS
+from adas_render import HudRenderer, CameraPanelCompositor
+
+class DisplayCompositor:
+    """HUD on the left, camera panel on the right, in one canvas and one pygame window.
+
+    ``draw_hud``/``draw_cameras`` update the canvas and mark their region
+    dirty; ``present`` pushes dirty regions to the window at most ``fps``
+    times a second (``due`` tells the loop whether rendering is worth it).
+    """
+
+    def __init__(self, titles, fps=DISPLAY_FPS, headless=DISPLAY_HEADLESS, caption="EV Infotainment - ADAS"):
+        panel_w, panel_h = CameraPanelCompositor.panel_size(len(titles))
+        self.width = HudRenderer.WIDTH + panel_w
+        self.height = max(HudRenderer.HEIGHT, panel_h)
+        self.canvas = np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self.hud_rect = pygame.Rect(0, 0, HudRenderer.WIDTH, HudRenderer.HEIGHT)
+        self.panel_rect = pygame.Rect(HudRenderer.WIDTH, 0, panel_w, panel_h)
+        self.hud = HudRenderer(target=self.canvas[:HudRenderer.HEIGHT, :HudRenderer.WIDTH])
+        self.panel = CameraPanelCompositor(titles, target=self.canvas[:panel_h, HudRenderer.WIDTH:])
+        self.fps = fps
+        self.headless = headless
+        self.caption = caption
+        self.window = None
+        self.surface = None
+        self.dirty = [self.hud_rect, self.panel_rect]
+        self.last_present = 0.0
+        self.presented = 0
+
+    def open(self):
+        """Open the window (no-op when headless)."""
+        if self.headless or self.window is not None:
+            return
+        pygame.display.init()
+        self.window = pygame.display.set_mode((self.width, self.height))
+        pygame.display.set_caption(self.caption)
+        self.surface = pygame.image.frombuffer(self.canvas, (self.width, self.height), "BGR")
+        self.dirty = [self.window.get_rect()]
+
+    def due(self, now=None):
+        """True when the next ``present`` would reach the screen under the ``fps`` pacing."""
+        if self.fps <= 0:
+            return True
+        now = time.perf_counter() if now is None else now
+        return now - self.last_present >= 1.0 / self.fps
+
+    def draw_hud(self, *args, **kwargs):
+        """Render the HUD into the canvas; arguments as ``HudRenderer.render``."""
+        _, changed = self.hud.render(*args, **kwargs)
+        if changed and self.hud_rect not in self.dirty:
+            self.dirty.append(self.hud_rect)
+
+    def draw_cameras(self, frames, versions=None):
+        """Compose camera feeds into the canvas; arguments as ``CameraPanelCompositor.compose``."""
+        _, changed = self.panel.compose(frames, versions)
+        if changed and self.panel_rect not in self.dirty:
+            self.dirty.append(self.panel_rect)
+
+    def present(self, now=None):
+        """Push the changed regions to the window; returns True if anything was shown."""
+        now = time.perf_counter() if now is None else now
+        self.last_present = now
+        if not self.dirty:
+            return False
+        if self.window is not None:
+            for rect in self.dirty:
+                self.window.blit(self.surface, rect, rect)
+            pygame.display.update(self.dirty)
+        self.dirty = []
+        self.presented += 1
+        return True
+
+    def closed(self):
+        """Drain window events; True if the user closed the window."""
+        if not pygame.display.get_init():
+            return False
+        return any(event.type == pygame.QUIT for event in pygame.event.get())
+
+    def close(self):
+        self.surface = None
+        if self.window is not None:
+            pygame.display.quit()
+            self.window = None
@@ -0,0 +1,276 @@
+#!/usr/bin/env python
+"""
+ADAS Multi-Process Detection Engine
+Runs detection for any number of cameras on a pool of worker processes.
+Camera callbacks write frames into shared-memory FrameBuffers; each worker
+reads the newest frame of its cameras straight from shared memory, runs
+inference and posts boxes to a shared results buffer guarded by per-camera
+sequence counters (seqlock), which the control loop polls without locking.
+
+Requires Python 3.8+ (multiprocessing.shared_memory).
+"""
+
+import time
+import queue
+import multiprocessing
+import numpy as np
+import cv2
+from adas_config import DETECTION_WORKERS, DETECTION_ASSIGNMENT, ENGINE_MAX_DETECTIONS
+
+def result_dtype(max_dets):
+    return np.dtype([("seq", "<i8"), ("count", "<i8"), ("captured", "<f8"), ("n", "<i4"),
+                     ("reused", "u1"), ("dets", "<f4", (max_dets, 6))])
+
+class ResultSlots:
+    """One seqlock-guarded detection result per camera in a shared-memory block.
+
+    The single writer of a slot makes ``seq`` odd, fills the slot and makes it
+    even again; a reader accepts a copy only if ``seq`` was even and unchanged
+    across the copy.
+    """
+
+    def __init__(self, cameras, max_dets, name=None):
+        from multiprocessing import shared_memory
+        dtype = result_dtype(max_dets)
+        self.owner = name is None
+        if self.owner:
+            self.shm = shared_memory.SharedMemory(create=True, size=dtype.itemsize * cameras)
+        else:
+            self.shm = shared_memory.SharedMemory(name=name)
+        self.slots = np.ndarray((cameras,), dtype=dtype, buffer=self.shm.buf)
+        if self.owner:
+            self.slots["seq"] = 0
+        self.max_dets = max_dets
+
+    def write(self, i, dets, count, captured, reused=False):
+        slot = self.slots[i:i + 1]
+        n = min(len(dets), self.max_dets)
+        slot["seq"] += 1
+        slot["dets"][0, :n] = dets[:n]
+        slot["n"] = n
+        slot["reused"] = reused
+        slot["count"] = count
+        slot["captured"] = captured
+        slot["seq"] += 1
+
+    def read(self, i, last_seq):
+        """Return ``(seq, dets, count, captured, reused)`` if slot ``i`` has a newer complete result, else None."""
+        slot = self.slots[i]
+        seq = int(slot["seq"])
+        if seq == last_seq or seq & 1:
+            return None
+        n = int(slot["n"])
+        dets = slot["dets"][:n].copy()
+        count, captured, reused = int(slot["count"]), float(slot["captured"]), bool(slot["reused"])
+        if int(self.slots[i]["seq"]) != seq:
+            return None
+        return seq, dets, count, captured, reused
+
+    def close(self):
+        self.slots = None
+        self.shm.close()
+        if self.owner:
+            self.shm.unlink()
+
+def assign_cameras(sides, workers, assignment=None):
+    """Map camera index -> worker index from an explicit ``{side: worker}`` dict or round-robin."""
+    if assignment:
+        return [int(assignment.get(side, i % workers)) % workers for i, side in enumerate(sides)]
+    return [i % workers for i in range(len(sides))]
+
+def _worker_main(worker_id, sides, specs, results_name, max_dets, cameras, jobs, ready, threads, names):
+    """Worker process: load and warm up the model, then serve camera indices from ``jobs`` until None arrives."""
+    import time
+    import adas_config
+    import adas_backends
+    from adas_buffers import FrameBuffer
+    from adas_motion import MotionGate
+    from adas_utils import crop_for_detection
+    if threads:
+        adas_backends.INFERENCE_THREADS = threads
+        try:
+            import torch
+            torch.set_num_threads(threads)
+        except ImportError:
+            pass
+    backend = adas_backends.create_backend(adas_config.DETECTION_BACKEND, adas_config.load_model())
+    adas_config.warm_up_backend(backend, [sides[i] for i in cameras])
+    buffers = {i: FrameBuffer.attach(specs[i]) for i in cameras}
+    results = ResultSlots(len(specs), max_dets, name=results_name)
+    last_frame = dict.fromkeys(cameras, -1)
+    gates = {i: MotionGate() for i in cameras}
+    last_dets = {}
+    rgb = getattr(backend, "input_format", "rgb") == "rgb"
+    # The main process does not load a model in "process" mode; it takes the class names from us.
+    names.put(dict(backend.names) if isinstance(backend.names, dict) else list(backend.names))
+    ready.set()
+    try:
+        while True:
+            item = jobs.get()
+            if item is None:
+                break
+            wanted = {item}
+            while True:
+                try:
+                    item = jobs.get_nowait()
+                except queue.Empty:
+                    break
+                if item is None:
+                    return
+                wanted.add(item)
+            batch = []
+            for i in sorted(wanted):
+                buffer = buffers[i]
+                ref = buffer.read()
+                if ref.frame is None or ref.frame_id == last_frame[i]:
+                    continue
+                view, offset = crop_for_detection(ref.frame, sides[i], rgb=False)
+                roi = view.copy()
+                # The slot may have been rewritten while we copied it; skip rather than use a torn frame.
+                # Checked before the motion gate so its reference only ever holds frames we act on.
+                if buffer.count - ref.count >= buffer.slots - 1:
+                    continue
+                reuse = (adas_config.MOTION_GATING and i in last_dets and
+                         not gates[i].should_infer(roi, time.time()))
+                last_frame[i] = ref.frame_id
+                if reuse:
+                    results.write(i, last_dets[i], ref.count, ref.captured, reused=True)
+                    continue
+                batch.append((i, cv2.cvtColor(roi, cv2.COLOR_BGR2RGB) if rgb else roi, offset, ref))
+            if not batch:
+                continue
+            detections = backend.infer([image for _, image, _, _ in batch], adas_config.DETECTION_INPUT_SIZE)
+            for (i, _, offset, ref), dets in zip(batch, detections):
+                last_dets[i] = dets + offset
+                results.write(i, last_dets[i], ref.count, ref.captured)
+    finally:
+        for buffer in buffers.values():
+            buffer.close()
+        results.close()
+
+class DetectionEngine:
+    """Process-pool detector over shared-memory FrameBuffers for any set of cameras.
+
+    ``submit(indices)`` queues cameras for detection without blocking;
+    ``poll()`` applies finished results to the cameras' alert states on the
+    calling thread, so tracking, logging and audio stay in the main process.
+    """
+
+    def __init__(self, sides, states, sources, workers=DETECTION_WORKERS, assignment=DETECTION_ASSIGNMENT,
+                 max_dets=ENGINE_MAX_DETECTIONS):
+        self.sides = list(sides)
+        self.states = list(states)
+        self.sources = list(sources)
+        self.workers = max(1, min(int(workers), len(self.sides)))
+        self.owner_of = assign_cameras(self.sides, self.workers, assignment)
+        self.max_dets = max_dets
+        self.results = None
+        self.processes = []
+        self.jobs = []
+        self.ready = []
+        self.names = None
+        self.have_names = False
+        self.last_seq = [0] * len(self.sides)
+        self.submitted = 0
+        self.dropped = 0
+        self.processed = 0
+        self.reused = 0
+
+    def start(self):
+        """Create the results buffer and spawn the worker processes (models load in the background)."""
+        self.results = ResultSlots(len(self.sides), self.max_dets)
+        ctx = multiprocessing.get_context("spawn")
+        from adas_backends import inference_threads
+        threads = inference_threads(self.workers)
+        specs = [source.spec for source in self.sources]
+        self.names = ctx.Queue()
+        for w in range(self.workers):
+            cameras = [i for i, owner in enumerate(self.owner_of) if owner == w]
+            jobs = ctx.Queue(maxsize=2 * len(cameras))
+            ready = ctx.Event()
+            process = ctx.Process(target=_worker_main, name=f"DetectionEngine-{w}", daemon=True,
+                                  args=(w, self.sides, specs, self.results.shm.name, self.max_dets,
+                                        cameras, jobs, ready, threads, self.names))
+            process.start()
+            self.processes.append(process)
+            self.jobs.append(jobs)
+            self.ready.append(ready)
+        print(f"✓ Detection engine: {self.workers} worker process(es) for " +
+              ", ".join(f"{side}->{w}" for side, w in zip(self.sides, self.owner_of)))
+
+    def check_workers(self):
+        """Raise RuntimeError if a worker process has exited (e.g. its model or backend failed to load)."""
+        for process in self.processes:
+            if process.exitcode is not None:
+                raise RuntimeError(f"{process.name} exited with code {process.exitcode}")
+
+    def wait_ready(self, timeout=60.0):
+        """Wait until every worker has loaded its model; returns False on timeout.
+
+        Raises RuntimeError as soon as a worker dies instead of waiting out the timeout.
+        """
+        deadline = time.monotonic() + timeout
+        for ready in self.ready:
+            while not ready.wait(min(0.25, max(0.0, deadline - time.monotonic()))):
+                self.check_workers()
+                if time.monotonic() >= deadline:
+                    return False
+        return True
+
+    def submit(self, indices=None):
+        """Queue cameras for detection; a full worker queue drops the request."""
+        for i in range(len(self.sides)) if indices is None else indices:
+            try:
+                self.jobs[self.owner_of[i]].put_nowait(i)
+                self.submitted += 1
+            except queue.Full:
+                self.dropped += 1
+
+    def poll(self):
+        """Apply every new result to its camera's state; returns the number applied.
+
+        Raises RuntimeError if a worker process has died.
+        """
+        self.check_workers()
+        from adas_utils import update_blindspot_state, set_class_names
+        applied = 0
+        for i, side in enumerate(self.sides):
+            result = self.results.read(i, self.last_seq[i])
+            if result is None:
+                continue
+            if not self.have_names:
+                # Workers send their class names before their first result.
+                try:
+                    set_class_names(self.names.get(timeout=5.0))
+                except queue.Empty:
+                    raise RuntimeError("Detection workers did not report their class names")
+                self.have_names = True
+            self.last_seq[i], dets, _, captured, reused = result
+            update_blindspot_state(dets, self.sources[i].frames.shape[1:], self.states[i], side, captured,
+                                   log=not reused)
+            self.reused += reused
+            applied += 1
+        self.processed += applied
+        return applied
+
+    def stats(self):
+        return {"submitted": self.submitted, "processed": self.processed, "dropped": self.dropped,
+                "reused": self.reused, "workers": self.workers}
+
+    def stop(self, timeout=2.0):
+        """Stop the workers and release the results buffer."""
+        for jobs in self.jobs:
+            try:
+                jobs.put(None, timeout=timeout)
+            except queue.Full:
+                pass
+        for process in self.processes:
+            process.join(timeout)
+            if process.is_alive():
+                print(f"Warning: {process.name} did not stop within timeout")
+                process.terminate()
+        self.processes = []
+        self.jobs = []
+        if self.results is not None:
+            self.results.close()
+            self.results = None
@@ -0,0 +1,191 @@
+#!/usr/bin/env python
+"""
+ADAS Detection Logging
+Background detection logger: records are queued from the control loop and
+written in batches to rotating CSV files, optionally mirrored to a compact
+binary record stream.
+"""
+
+import os
+import csv
+import queue
+import threading
+import time
+import datetime
+import numpy as np
+
+LOG_COLUMNS = ["time", "vehicle_detected", "confidence", "side",
+               "alert_level", "lane_departure", "distance_m", "rel_speed_mps", "track_id"]
+
+# Fixed-layout record used by the binary log. Each batch is appended to the
+# ``.rec`` file as one ``np.save`` chunk; read it back by calling ``np.load``
+# on the open file until EOF. Missing numeric values are stored as NaN, a
+# missing track id as -1.
+RECORD_DTYPE = np.dtype([
+    ("time", "<f8"),
+    ("vehicle_detected", "S16"),
+    ("confidence", "<f4"),
+    ("side", "S8"),
+    ("alert_level", "S8"),
+    ("lane_departure", "u1"),
+    ("distance_m", "<f4"),
+    ("rel_speed_mps", "<f4"),
+    ("track_id", "<i4"),
+])
+
+_STOP = object()
+
+def _fmt(value, spec=None):
+    if value is None or value == "":
+        return ""
+    return format(value, spec) if spec else value
+
+def _num(value):
+    return np.nan if value is None or value == "" else float(value)
+
+class DetectionLogger:
+    """Non-blocking detection logger backed by a bounded queue and a writer thread.
+
+    ``log`` never waits: when the queue is full the record is dropped and
+    counted. Files rotate once they exceed ``max_bytes`` or ``max_seconds``
+    (0 disables either limit).
+    """
+
+    def __init__(self, log_dir, max_bytes=0, max_seconds=0, queue_size=10000,
+                 batch_size=256, flush_interval=0.5, binary=False):
+        self.log_dir = log_dir
+        self.max_bytes = max_bytes
+        self.max_seconds = max_seconds
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self.binary = binary
+        self.queue = queue.Queue(maxsize=queue_size)
+        self.logged = 0
+        self.written = 0
+        self.dropped = 0
+        self.files_opened = 0
+        self.csv_file = self.bin_file = None
+        self.csv_path = self.bin_path = None
+        self._open()
+        self.thread = threading.Thread(target=self._run, name="DetectionLogger", daemon=True)
+        self.thread.start()
+
+    def log(self, vehicle_detected="", confidence=None, side="", alert_level="",
+            lane_departure="", distance_m=None, rel_speed_mps=None, track_id=None):
+        """Queue one log row stamped with the current time; drops it if the queue is full."""
+        record = (time.time(), vehicle_detected, confidence, side, alert_level,
+                  lane_departure, distance_m, rel_speed_mps, track_id)
+        try:
+            self.queue.put_nowait(record)
+            self.logged += 1
+        except queue.Full:
+            self.dropped += 1
+
+    def log_many(self, rows):
+        """Queue ``(vehicle_detected, confidence, side, alert_level, track_id)`` rows as one item.
+
+        All rows share one timestamp and one queue slot; if the queue is full
+        the whole group is dropped and counted row by row.
+        """
+        if not rows:
+            return
+        now = time.time()
+        records = [(now, vehicle, conf, side, level, "", None, None, track_id)
+                   for vehicle, conf, side, level, track_id in rows]
+        try:
+            self.queue.put_nowait(records)
+            self.logged += len(records)
+        except queue.Full:
+            self.dropped += len(records)
+
+    def _open(self):
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        base = os.path.join(self.log_dir, f"detections_{stamp}")
+        suffix = 1
+        while os.path.exists(base + ".csv"):
+            base = os.path.join(self.log_dir, f"detections_{stamp}_{suffix}")
+            suffix += 1
+        self.csv_path = base + ".csv"
+        self.csv_file = open(self.csv_path, "w", newline="")
+        self.csv_writer = csv.writer(self.csv_file)
+        self.csv_writer.writerow(LOG_COLUMNS)
+        if self.binary:
+            self.bin_path = base + ".rec"
+            self.bin_file = open(self.bin_path, "wb")
+        self.opened_at = time.time()
+        self.files_opened += 1
+
+    def _close_files(self):
+        for f in (self.csv_file, self.bin_file):
+            if f is not None:
+                f.close()
+        self.csv_file = self.bin_file = None
+
+    def _should_rotate(self):
+        if self.max_bytes and self.csv_file.tell() >= self.max_bytes:
+            return True
+        return bool(self.max_seconds) and time.time() - self.opened_at >= self.max_seconds
+
+    def _write(self, batch):
+        if self._should_rotate():
+            self._close_files()
+            self._open()
+        self.csv_writer.writerows(
+            [datetime.datetime.fromtimestamp(r[0]), r[1], _fmt(r[2]), r[3], r[4],
+             r[5], _fmt(r[6], ".1f"), _fmt(r[7], ".1f"), _fmt(r[8])] for r in batch)
+        self.csv_file.flush()
+        if self.bin_file is not None:
+            chunk = np.array([(r[0], str(r[1]).encode()[:16], _num(r[2]), str(r[3]).encode()[:8],
+                               str(r[4]).encode()[:8], 1 if r[5] else 0, _num(r[6]), _num(r[7]),
+                               -1 if r[8] is None else r[8])
+                              for r in batch], dtype=RECORD_DTYPE)
+            np.save(self.bin_file, chunk)
+            self.bin_file.flush()
+        self.written += len(batch)
+
+    def _run(self):
+        batch = []
+        deadline = time.time() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get(timeout=max(0.0, deadline - time.time()))
+            except queue.Empty:
+                item = None
+            if item is _STOP:
+                break
+            if isinstance(item, list):
+                batch.extend(item)
+            elif item is not None:
+                batch.append(item)
+            if batch and (len(batch) >= self.batch_size or time.time() >= deadline):
+                self._write(batch)
+                batch = []
+            if time.time() >= deadline:
+                deadline = time.time() + self.flush_interval
+        while True:
+            try:
+                item = self.queue.get_nowait()
+            except queue.Empty:
+                break
+            if isinstance(item, list):
+                batch.extend(item)
+            elif item is not _STOP:
+                batch.append(item)
+        if batch:
+            self._write(batch)
+        self._close_files()
+
+    def stats(self):
+        """Return record counters (queued, written, dropped) and the number of files opened."""
+        return {"logged": self.logged, "written": self.written, "dropped": self.dropped,
+                "pending": self.queue.qsize(), "files": self.files_opened}
+
+    def close(self, timeout=5.0):
+        """Flush pending records, close the files and stop the writer thread."""
+        if not self.thread.is_alive():
+            return
+        try:
+            self.queue.put(_STOP, timeout=timeout)
+        except queue.Full:
+            print("Warning: Detection log queue full at shutdown; pending records may be lost")
+        self.thread.join(timeout)
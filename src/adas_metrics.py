@@ -0,0 +1,142 @@
+#!/usr/bin/env python
+"""
+ADAS Performance Metrics
+Low-overhead per-stage frame timing, inference and frame-to-alert latency
+rings, a HUD overlay and periodic dumps of rolling percentiles to logs/.
+"""
+
+import os
+import csv
+import time
+import datetime
+import threading
+import collections
+import numpy as np
+from adas_config import LOGS_DIR, PERF_WINDOW
+
+PERCENTILES = (50, 95, 99)
+
+class LatencyRing:
+    """Fixed-size ring of latency samples in seconds; safe to record from any thread."""
+
+    def __init__(self, capacity=PERF_WINDOW):
+        self.samples = np.zeros(capacity)
+        self.count = 0
+        self.lock = threading.Lock()
+
+    def record(self, seconds):
+        with self.lock:
+            self.samples[self.count % len(self.samples)] = seconds
+            self.count += 1
+
+    def percentiles(self, q=PERCENTILES):
+        """Rolling percentiles over the window, or None before the first sample."""
+        with self.lock:
+            n = min(self.count, len(self.samples))
+            if n == 0:
+                return None
+            return np.percentile(self.samples[:n], q)
+
+class FrameProfiler:
+    """Times named stages of each loop iteration into a ring buffer of per-frame rows."""
+
+    def __init__(self, stages, capacity=PERF_WINDOW):
+        self.stages = tuple(stages)
+        self.index = {stage: i for i, stage in enumerate(self.stages)}
+        self.samples = np.zeros((capacity, len(self.stages)))
+        self.current = np.zeros(len(self.stages))
+        self.count = 0
+        self.last = None
+
+    def begin(self):
+        """Start timing a new frame."""
+        self.current[:] = 0.0
+        self.last = time.perf_counter()
+
+    def mark(self, stage):
+        """Charge the time since the previous mark to ``stage``."""
+        now = time.perf_counter()
+        self.current[self.index[stage]] += now - self.last
+        self.last = now
+
+    def end(self):
+        """Store the finished frame in the ring."""
+        self.samples[self.count % len(self.samples)] = self.current
+        self.count += 1
+
+    def percentiles(self, q=PERCENTILES):
+        """Rolling percentiles per stage as a ``(len(q), stages)`` array, or None if empty."""
+        n = min(self.count, len(self.samples))
+        if n == 0:
+            return None
+        return np.percentile(self.samples[:n], q, axis=0)
+
+# Shared latency rings: inference time per detection batch, time from a
+# camera callback to the blind-spot state change it caused, per side, and an
+# estimate from an alert trigger to its sound reaching the output device
+# (trigger to channel start plus one mixer buffer, see adas_audio).
+inference_latency = LatencyRing()
+alert_latency = collections.defaultdict(LatencyRing)
+audio_latency_estimate = LatencyRing()
+
+def summary_rows(profiler):
+    """Return ``(name, p50, p95, p99)`` rows in milliseconds for every stage and latency ring."""
+    rows = []
+    stage_pct = profiler.percentiles()
+    if stage_pct is not None:
+        for i, stage in enumerate(profiler.stages):
+            rows.append((stage,) + tuple(stage_pct[:, i] * 1000))
+        total = np.percentile(profiler.samples[:min(profiler.count, len(profiler.samples))].sum(axis=1),
+                              PERCENTILES)
+        rows.append(("frame",) + tuple(total * 1000))
+    pct = inference_latency.percentiles()
+    if pct is not None:
+        rows.append(("inference",) + tuple(pct * 1000))
+    for side in sorted(alert_latency):
+        pct = alert_latency[side].percentiles()
+        if pct is not None:
+            rows.append((f"alert_{side}",) + tuple(pct * 1000))
+    pct = audio_latency_estimate.percentiles()
+    if pct is not None:
+        rows.append(("audio_est",) + tuple(pct * 1000))
+    return rows
+
+def overlay_lines(profiler):
+    """Rows of ``(name, p50, p95, p99)`` text cells in ms for the HUD performance overlay."""
+    rows = [("ms", "p50", "p95", "p99")]
+    rows += [(name, f"{p50:.1f}", f"{p95:.1f}", f"{p99:.1f}") for name, p50, p95, p99 in summary_rows(profiler)]
+    return tuple(rows)
+
+class MetricsReporter:
+    """Background thread appending rolling percentiles to ``logs/perf_*.csv`` at a fixed interval."""
+
+    def __init__(self, profiler, interval, log_dir=None):
+        self.profiler = profiler
+        self.interval = interval
+        stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+        self.path = os.path.join(log_dir or LOGS_DIR, f"perf_{stamp}.csv")
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self._run, name="MetricsReporter", daemon=True)
+        with open(self.path, "w", newline="") as f:
+            csv.writer(f).writerow(["time", "metric", "p50_ms", "p95_ms", "p99_ms", "frames"])
+
+    def start(self):
+        self.thread.start()
+
+    def _run(self):
+        while not self.stopped.wait(self.interval):
+            self.dump()
+
+    def dump(self):
+        """Append the current rolling percentiles as one block of rows."""
+        stamp = datetime.datetime.now()
+        with open(self.path, "a", newline="") as f:
+            csv.writer(f).writerows([stamp, name, f"{p50:.3f}", f"{p95:.3f}", f"{p99:.3f}", self.profiler.count]
+                                    for name, p50, p95, p99 in summary_rows(self.profiler))
+
+    def stop(self):
+        """Stop the thread and write a final block."""
+        self.stopped.set()
+        if self.thread.is_alive():
+            self.thread.join(2.0)
+        self.dump()
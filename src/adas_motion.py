@@ -0,0 +1,62 @@
+#!/usr/bin/env python
+"""
+ADAS Motion Gate
+Cheap change detector run before blind-spot inference: the detection ROI is
+shrunk to a small grayscale thumbnail and compared with the thumbnail of the
+frame that last went through YOLO. Static mirror scenes (parked, or empty
+road at a steady speed) reuse the previous result instead of paying for
+another inference.
+"""
+
+import numpy as np
+import cv2
+from adas_config import MOTION_THRESHOLD, MOTION_MAX_REUSE_AGE, MOTION_THUMB_SIZE
+
+class MotionGate:
+    """Per-camera gate deciding whether a frame needs fresh inference.
+
+    ``should_infer`` returns False while the thumbnail's mean absolute
+    difference from the last inferred frame stays below ``threshold`` and
+    that inference is younger than ``max_age`` seconds.
+    """
+
+    def __init__(self, threshold=MOTION_THRESHOLD, max_age=MOTION_MAX_REUSE_AGE, size=MOTION_THUMB_SIZE):
+        self.threshold = threshold
+        self.max_age = max_age
+        self.size = tuple(size)
+        self.small = np.empty((self.size[1], self.size[0], 3), dtype=np.uint8)
+        self.reference = None
+        self.reference_time = None
+        self.last_score = 0.0
+        self.checked = 0
+        self.skipped = 0
+
+    def _thumbnail(self, roi):
+        cv2.resize(roi, self.size, dst=self.small, interpolation=cv2.INTER_AREA)
+        return cv2.cvtColor(self.small, cv2.COLOR_BGR2GRAY)
+
+    def should_infer(self, roi, now):
+        """Return True if ``roi`` changed enough (or the last result is too old) to run inference."""
+        self.checked += 1
+        thumb = self._thumbnail(roi)
+        if self.reference is not None and 0 <= now - self.reference_time < self.max_age:
+            self.last_score = float(cv2.absdiff(thumb, self.reference).mean())
+            if self.last_score < self.threshold:
+                self.skipped += 1
+                return False
+        self.reference = thumb
+        self.reference_time = now
+        return True
+
+    @property
+    def skip_ratio(self):
+        return self.skipped / self.checked if self.checked else 0.0
+
+def gate_summary(states, sides):
+    """``side skipped/checked (pct)`` text for the sides whose state holds a MotionGate."""
+    parts = []
+    for state, side in zip(states, sides):
+        gate = state.get("motion")
+        if gate is not None:
+            parts.append(f"{side} {gate.skipped}/{gate.checked} ({gate.skip_ratio:.0%})")
+    return ", ".join(parts)
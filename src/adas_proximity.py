@@ -0,0 +1,96 @@
+#!/usr/bin/env python
+"""
+ADAS Proximity Engine
+Per-tick vehicle positions and velocities from one world snapshot, with
+distances, forward-cone filtering and time-to-collision computed in NumPy.
+"""
+
+import math
+import numpy as np
+from adas_config import PROXIMITY_CONE_DEG
+
+class ProximityEngine:
+    """Vectorized nearest-vehicle, forward-cone and TTC queries around the ego vehicle."""
+
+    def __init__(self, world, vehicle, cone_deg=PROXIMITY_CONE_DEG):
+        self.world = world
+        self.vehicle = vehicle
+        self.cos_half_cone = math.cos(math.radians(cone_deg / 2.0))
+        self.vehicle_ids = set()
+        self.other_ids = set()
+        self.ids = np.zeros(0, dtype=np.int64)
+        self.positions = np.zeros((0, 3))
+        self.velocities = np.zeros((0, 3))
+
+    def _classify(self, snapshot):
+        """Sort actor ids seen for the first time into vehicles and everything else.
+
+        Ids of actors no longer in the snapshot are forgotten, so the sets
+        stay bounded as actors are destroyed and respawned.
+        """
+        current = {a.id for a in snapshot}
+        self.vehicle_ids &= current
+        self.other_ids &= current
+        unknown = current - self.vehicle_ids - self.other_ids
+        if not unknown:
+            return
+        actors = self.world.get_actors(list(unknown))
+        vehicles = {a.id for a in actors.filter("vehicle.*")}
+        self.vehicle_ids |= vehicles
+        self.other_ids |= unknown - vehicles
+
+    def _load(self, snapshot):
+        """Fill the position/velocity arrays from the snapshot; returns the ego actor snapshot."""
+        self._classify(snapshot)
+        ego = snapshot.find(self.vehicle.id)
+        others = [a for a in snapshot if a.id in self.vehicle_ids and a.id != self.vehicle.id]
+        n = len(others)
+        if self.positions.shape[0] < n:
+            self.positions = np.zeros((n, 3))
+            self.velocities = np.zeros((n, 3))
+            self.ids = np.zeros(n, dtype=np.int64)
+        for i, actor in enumerate(others):
+            loc = actor.get_transform().location
+            vel = actor.get_velocity()
+            self.positions[i] = (loc.x, loc.y, loc.z)
+            self.velocities[i] = (vel.x, vel.y, vel.z)
+            self.ids[i] = actor.id
+        return ego, n
+
+    def update(self):
+        """Take one world snapshot and return the proximity reading for this tick.
+
+        The reading holds the nearest vehicle's distance, speed difference and
+        id, plus the nearest vehicle inside the forward cone and the smallest
+        time-to-collision of any closing vehicle in that cone.
+        """
+        snapshot = self.world.get_snapshot()
+        ego, n = self._load(snapshot)
+        reading = {"distance": None, "rel_speed": 0.0, "actor_id": None,
+                   "ahead_distance": None, "ttc": None}
+        if ego is None or n == 0:
+            return reading
+        ego_tf = ego.get_transform()
+        ego_vel_v = ego.get_velocity()
+        ego_pos = np.array([ego_tf.location.x, ego_tf.location.y, ego_tf.location.z])
+        ego_vel = np.array([ego_vel_v.x, ego_vel_v.y, ego_vel_v.z])
+        fwd_v = ego_tf.get_forward_vector()
+        forward = np.array([fwd_v.x, fwd_v.y, fwd_v.z])
+
+        offsets = self.positions[:n] - ego_pos
+        dist = np.sqrt(np.einsum("ij,ij->i", offsets, offsets))
+        nearest = int(np.argmin(dist))
+        speeds = np.sqrt(np.einsum("ij,ij->i", self.velocities[:n], self.velocities[:n]))
+        reading["distance"] = float(dist[nearest])
+        reading["rel_speed"] = float(speeds[nearest] - np.sqrt(ego_vel.dot(ego_vel)))
+        reading["actor_id"] = int(self.ids[nearest])
+
+        safe_dist = np.maximum(dist, 1e-6)
+        in_cone = offsets.dot(forward) / safe_dist >= self.cos_half_cone
+        if in_cone.any():
+            reading["ahead_distance"] = float(dist[in_cone].min())
+            closing = -np.einsum("ij,ij->i", offsets, self.velocities[:n] - ego_vel) / safe_dist
+            approaching = in_cone & (closing > 0)
+            if approaching.any():
+                reading["ttc"] = float((dist[approaching] / closing[approaching]).min())
+        return reading
@@ -0,0 +1,260 @@
+#!/usr/bin/env python
+"""
+ADAS Sensor Recorder and Replay
+Records the four camera feeds into preallocated memory-mapped frame files,
+with frame ids, timestamps, ego telemetry and lane-invasion events, and
+replays a recording through blind-spot detection as fast as the CPU allows.
+
+Usage:
+    python src/adas_dashboard.py --record
+    python src/adas_recorder.py recordings/session_YYYYMMDD_HHMMSS --out levels.csv
+"""
+
+import os
+import csv
+import json
+import time
+import datetime
+import argparse
+import threading
+import numpy as np
+import cv2
+from adas_config import RECORDINGS_DIR, RECORD_MAX_FRAMES, CAMERA_WIDTH, CAMERA_HEIGHT
+
+CAMERA_SIDES = ("left", "right", "front", "rear")
+FRAME_META_DTYPE = np.dtype([("frame", "i8"), ("timestamp", "f8")])
+TELEMETRY_DTYPE = np.dtype([("frame", "i8"), ("time", "f8"), ("x", "f4"), ("y", "f4"), ("z", "f4"),
+                            ("yaw", "f4"), ("speed_mps", "f4"), ("throttle", "f4"), ("brake", "f4"),
+                            ("steer", "f4"), ("reverse", "u1")])
+LANE_EVENT_DTYPE = np.dtype([("frame", "i8"), ("timestamp", "f8")])
+
+class SessionRecorder:
+    """Writes camera frames and telemetry into preallocated np.memmap files in one session directory.
+
+    Each camera gets a ``<side>.u8`` file of ``max_frames`` BGR frames and a
+    ``<side>_meta.dat`` file of frame ids and sensor timestamps. Frames beyond
+    ``max_frames`` are counted as dropped. ``close()`` trims the files to the
+    frames actually written and writes ``session.json``.
+    """
+
+    def __init__(self, path=None, sides=CAMERA_SIDES, width=CAMERA_WIDTH, height=CAMERA_HEIGHT,
+                 max_frames=RECORD_MAX_FRAMES):
+        if not path:
+            stamp = datetime.datetime.now().strftime('%Y%m%d_%H%M%S')
+            path = os.path.join(RECORDINGS_DIR, f"session_{stamp}")
+        os.makedirs(path, exist_ok=True)
+        self.path = path
+        self.sides = tuple(sides)
+        self.width, self.height = width, height
+        self.max_frames = int(max_frames)
+        self.frames, self.meta = {}, {}
+        for side in self.sides:
+            self.frames[side] = np.memmap(self._file(f"{side}.u8"), dtype=np.uint8, mode="w+",
+                                          shape=(self.max_frames, height, width, 3))
+            self.meta[side] = np.memmap(self._file(f"{side}_meta.dat"), dtype=FRAME_META_DTYPE,
+                                        mode="w+", shape=(self.max_frames,))
+        self.telemetry = np.memmap(self._file("telemetry.dat"), dtype=TELEMETRY_DTYPE, mode="w+",
+                                   shape=(self.max_frames,))
+        self.counts = dict.fromkeys(self.sides, 0)
+        self.ticks = 0
+        self.dropped = 0
+        self.lane_events = []
+        self.lock = threading.Lock()
+        self.closed = False
+
+    def _file(self, name):
+        return os.path.join(self.path, name)
+
+    def write(self, side, image):
+        """Sensor callback: convert a CARLA BGRA image straight into the side's next frame slot."""
+        i = self.counts[side]
+        if self.closed or i >= self.max_frames:
+            self.dropped += 1
+            return
+        if (image.height, image.width) != (self.height, self.width):
+            self.dropped += 1
+            return
+        bgra = np.frombuffer(image.raw_data, dtype=np.uint8).reshape((image.height, image.width, 4))
+        cv2.cvtColor(bgra, cv2.COLOR_BGRA2BGR, dst=self.frames[side][i])
+        self.meta[side][i] = (image.frame, image.timestamp)
+        self.counts[side] = i + 1
+
+    def tee(self, side, callback):
+        """Return a sensor callback that records the image and then passes it to ``callback``."""
+        def listen(image):
+            self.write(side, image)
+            callback(image)
+        return listen
+
+    def record_tick(self, frame_id, vehicle, control, speed_mps):
+        """Store the ego vehicle's pose, speed and control inputs for one world tick."""
+        if self.closed or self.ticks >= self.max_frames:
+            return
+        t = vehicle.get_transform()
+        loc = t.location
+        self.telemetry[self.ticks] = (frame_id or 0, time.time(), loc.x, loc.y, loc.z, t.rotation.yaw,
+                                      speed_mps, control.throttle, control.brake, control.steer,
+                                      control.reverse)
+        self.ticks += 1
+
+    def record_lane_event(self, frame_id, timestamp):
+        """Store one lane-invasion event (called from the sensor thread)."""
+        with self.lock:
+            self.lane_events.append((frame_id, timestamp))
+
+    def close(self):
+        """Flush the memory maps, trim unused slots and write the session index."""
+        if self.closed:
+            return
+        self.closed = True
+        maps = list(self.frames.values()) + list(self.meta.values()) + [self.telemetry]
+        for mm in maps:
+            mm.flush()
+        # Drop every reference to the maps before truncating: Windows refuses to
+        # truncate a file that is still mapped, and no mapping may outlive its file size.
+        del mm, maps
+        self.frames, self.meta, self.telemetry = {}, {}, None
+        frame_bytes = self.height * self.width * 3
+        for side in self.sides:
+            os.truncate(self._file(f"{side}.u8"), self.counts[side] * frame_bytes)
+            os.truncate(self._file(f"{side}_meta.dat"), self.counts[side] * FRAME_META_DTYPE.itemsize)
+        os.truncate(self._file("telemetry.dat"), self.ticks * TELEMETRY_DTYPE.itemsize)
+        with self.lock:
+            np.save(self._file("lane_events.npy"), np.array(self.lane_events, dtype=LANE_EVENT_DTYPE))
+        with open(self._file("session.json"), "w") as f:
+            json.dump({"width": self.width, "height": self.height, "sides": list(self.sides),
+                       "counts": self.counts, "ticks": self.ticks, "dropped": self.dropped,
+                       "lane_events": len(self.lane_events)}, f, indent=2)
+
+class Recording:
+    """Read-only view of a recorded session; frames are np.memmap arrays, nothing is copied."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(os.path.join(path, "session.json")) as f:
+            self.info = json.load(f)
+        self.sides = tuple(self.info["sides"])
+        self.counts = self.info["counts"]
+        h, w = self.info["height"], self.info["width"]
+        self.frames, self.meta = {}, {}
+        for side in self.sides:
+            n = self.counts[side]
+            self.frames[side] = self._open(f"{side}.u8", np.uint8, (n, h, w, 3))
+            self.meta[side] = self._open(f"{side}_meta.dat", FRAME_META_DTYPE, (n,))
+        self.telemetry = self._open("telemetry.dat", TELEMETRY_DTYPE, (self.info["ticks"],))
+        self.lane_events = np.load(os.path.join(path, "lane_events.npy"))
+
+    def _open(self, name, dtype, shape):
+        if shape[0] == 0:
+            return np.zeros(shape, dtype=dtype)
+        return np.memmap(os.path.join(self.path, name), dtype=dtype, mode="r", shape=shape)
+
+def pair_frames(recording, sides):
+    """Indices into each side's frames for the CARLA frame ids recorded by every one of ``sides``.
+
+    Returns ``(frame_ids, {side: indices})``; raises ValueError if a side
+    was not recorded or the sides have no frame in common.
+    """
+    if not sides:
+        raise ValueError("No camera sides given to replay")
+    missing = [s for s in sides if s not in recording.sides]
+    if missing:
+        raise ValueError(f"Side(s) {', '.join(missing)} not in recording "
+                         f"(recorded: {', '.join(recording.sides)})")
+    frame_ids = recording.meta[sides[0]]["frame"]
+    for side in sides[1:]:
+        frame_ids = np.intersect1d(frame_ids, recording.meta[side]["frame"])
+    frame_ids = np.unique(frame_ids)
+    if not len(frame_ids):
+        raise ValueError(f"No frame was recorded by all of {', '.join(sides)}")
+    indices = {}
+    for side in sides:
+        ids = recording.meta[side]["frame"]
+        order = np.argsort(ids, kind="stable")
+        indices[side] = order[np.searchsorted(ids, frame_ids, sorter=order)]
+    return frame_ids, indices
+
+def replay(recording, sides=("left", "right"), skip=1, limit=None, out=None):
+    """Run recorded frames through blind-spot detection at full speed; return per-side summaries.
+
+    Frames of the different sides are paired by CARLA frame id (see
+    ``pair_frames``). Alert clearing uses the recorded sensor timestamps, so
+    levels match what the live loop would have shown regardless of replay
+    speed. Detection runs on every ``skip``-th frame set; tracks are
+    predicted on the sets between.
+    """
+    from adas_utils import detect_blindspot_frames, update_blindspot_tracks
+    sides = list(sides)
+    frame_ids, indices = pair_frames(recording, sides)
+    n = len(frame_ids)
+    if limit:
+        n = min(n, limit)
+    states = [{"level": "clear", "last_detection": 0} for _ in sides]
+    summary = {s: {"near": 0, "warn": 0, "alerts": 0} for s in sides}
+    writer = None
+    if out:
+        out_file = open(out, "w", newline="")
+        writer = csv.writer(out_file)
+        writer.writerow(["index", "frame", "timestamp"] + [f"{s}_level" for s in sides])
+    start = time.perf_counter()
+    processed = 0
+    try:
+        for i in range(n):
+            frame_id = frame_ids[i]
+            timestamp = float(recording.meta[sides[0]]["timestamp"][indices[sides[0]][i]])
+            previous = [state["level"] for state in states]
+            if i % skip == 0:
+                detect_blindspot_frames([recording.frames[s][indices[s][i]] for s in sides], states, sides,
+                                        now=timestamp)
+            else:
+                update_blindspot_tracks(states, sides, now=timestamp)
+            for side, state, before in zip(sides, states, previous):
+                if state["level"] != "clear":
+                    summary[side][state["level"]] += 1
+                    if before == "clear":
+                        summary[side]["alerts"] += 1
+            if writer:
+                writer.writerow([i, int(frame_id), f"{timestamp:.3f}"] + [state["level"] for state in states])
+            processed += 1
+    finally:
+        if writer:
+            out_file.close()
+    elapsed = time.perf_counter() - start
+    return processed, elapsed, summary
+
+def main():
+    parser = argparse.ArgumentParser(description="Replay a recorded ADAS session through blind-spot detection")
+    parser.add_argument("session", help="recording directory (recordings/session_*)")
+    parser.add_argument("--sides", nargs="+", default=["left", "right"], choices=CAMERA_SIDES,
+                        help="camera feeds to run detection on")
+    parser.add_argument("--skip", type=int, default=1, help="run detection on every Nth recorded frame (tracks are predicted in between)")
+    parser.add_argument("--limit", type=int, help="stop after this many recorded frames")
+    parser.add_argument("--out", metavar="FILE", help="write per-frame alert levels to a CSV file")
+    args = parser.parse_args()
+
+    import adas_config
+    recording = Recording(args.session)
+    print(f"✓ Loaded recording {args.session}: " +
+          ", ".join(f"{s} {recording.counts[s]} frames" for s in recording.sides) +
+          f", {len(recording.telemetry)} ticks, {len(recording.lane_events)} lane events")
+    try:
+        pair_frames(recording, args.sides)
+    except ValueError as e:
+        print(f"✗ {e}")
+        return
+    adas_config.start_services()
+    adas_config.wait_for_services()
+    adas_config.get_audio().mute()  # replay is silent
+    adas_config.print_startup_report()
+    processed, elapsed, summary = replay(recording, args.sides, max(1, args.skip), args.limit, args.out)
+    fps = processed / elapsed if elapsed > 0 else 0.0
+    print(f"\nReplayed {processed} frame sets in {elapsed:.2f} s ({fps:.1f} FPS)")
+    for side, counts in summary.items():
+        print(f"  {side:<6} alerts {counts['alerts']:4d}  near frames {counts['near']:5d}  "
+              f"warn frames {counts['warn']:5d}")
+    if args.out:
+        print(f"Per-frame levels written to {args.out}")
+    adas_config.get_logger().close()
+
+if __name__ == '__main__':
+    main()
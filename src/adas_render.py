@@ -0,0 +1,236 @@
+#!/usr/bin/env python
+"""
+ADAS Rendering
+Cached HUD renderer and camera panel compositor: static chrome is drawn once,
+only the parts that change are redrawn.
+"""
+
+import time
+import numpy as np
+import cv2
+from adas_config import CAMERA_PANEL_LAYOUT, CAMERA_TILE_SIZE
+
+FONT = cv2.FONT_HERSHEY_SIMPLEX
+
+def _alert_color(state, idle):
+    return (0, 0, 255) if state == "warn" else ((0, 215, 255) if state == "near" else idle)
+
+class HudRenderer:
+    """ADAS HUD built from a cached static layer plus the widgets that change per frame."""
+
+    HEIGHT, WIDTH = 820, 600
+
+    def __init__(self, target=None):
+        H, W = self.HEIGHT, self.WIDTH
+        self.block_x, self.block_y, self.block_w, self.block_h = 20, 80, 560, 460
+        self.body_h = self.block_h - 200
+        self.body_w = int(self.body_h * 0.45)
+        self.cx = self.block_x + self.block_w // 2
+        self.car_x1, self.car_y1 = self.cx - self.body_w // 2, self.block_y + 100
+        self.car_x2, self.car_y2 = self.cx + self.body_w // 2, self.car_y1 + self.body_h
+        self.strip_y = self.block_y + self.block_h + 10
+        self.panel_x, self.panel_y, self.panel_w, self.panel_h = 20, self.strip_y + 90, 560, 180
+        self.base = np.zeros((H, W, 3), dtype=np.uint8)
+        self._draw_static(self.base)
+        self.image = target if target is not None else np.zeros_like(self.base)
+        self.last_key = None
+
+    def _draw_static(self, hud):
+        """Draw everything that never changes: title bar, car schematic, labels, help text."""
+        W = self.WIDTH
+        block_x, block_y, block_w, block_h = self.block_x, self.block_y, self.block_w, self.block_h
+        cx, body_w = self.cx, self.body_w
+        car_x1, car_y1, car_x2, car_y2 = self.car_x1, self.car_y1, self.car_x2, self.car_y2
+        cv2.rectangle(hud, (0, 0), (W, 60), (35, 35, 35), -1)
+        cv2.putText(hud, "ADAS Dashboard", (20, 40), FONT, 1.0, (240, 240, 240), 2, cv2.LINE_AA)
+        cv2.rectangle(hud, (block_x, block_y), (block_x + block_w, block_y + block_h), (45, 45, 45), -1)
+        car_body_color = (180, 180, 180)
+        cv2.ellipse(hud, (cx, car_y1 + 20), (body_w // 2, 20), 0, 180, 360, car_body_color, -1)
+        cv2.rectangle(hud, (car_x1, car_y1 + 20), (car_x2, car_y2 - 20), car_body_color, -1)
+        cv2.ellipse(hud, (cx, car_y2 - 20), (body_w // 2, 20), 0, 0, 180, car_body_color, -1)
+        cv2.ellipse(hud, (cx, car_y1 + 20), (body_w // 2, 20), 0, 180, 360, (120, 120, 120), 2)
+        cv2.line(hud, (car_x1, car_y1 + 20), (car_x1, car_y2 - 20), (120, 120, 120), 2)
+        cv2.line(hud, (car_x2, car_y1 + 20), (car_x2, car_y2 - 20), (120, 120, 120), 2)
+        cv2.ellipse(hud, (cx, car_y2 - 20), (body_w // 2, 20), 0, 0, 180, (120, 120, 120), 2)
+        windshield_y = car_y1 + 25
+        windshield_h = 40
+        cv2.rectangle(hud, (car_x1 + 5, windshield_y), (car_x2 - 5, windshield_y + windshield_h), (80, 120, 180), -1)
+        rear_window_y = car_y2 - 45
+        rear_window_h = 25
+        cv2.rectangle(hud, (car_x1 + 5, rear_window_y), (car_x2 - 5, rear_window_y + rear_window_h), (80, 120, 180), -1)
+        cabin_y = windshield_y + windshield_h
+        cabin_h = rear_window_y - cabin_y
+        cv2.rectangle(hud, (car_x1 + 8, cabin_y), (car_x2 - 8, cabin_y + cabin_h), (150, 150, 150), -1)
+        mirror_w, mirror_h = 8, 18
+        mirror_offset_y = car_y1 + 60
+        cv2.rectangle(hud, (car_x1 - mirror_w - 3, mirror_offset_y), (car_x1 - 3, mirror_offset_y + mirror_h), (140, 140, 140), -1)
+        cv2.rectangle(hud, (car_x1 - mirror_w - 3, mirror_offset_y), (car_x1 - 3, mirror_offset_y + mirror_h), (100, 100, 100), 1)
+        cv2.rectangle(hud, (car_x2 + 3, mirror_offset_y), (car_x2 + mirror_w + 3, mirror_offset_y + mirror_h), (140, 140, 140), -1)
+        cv2.rectangle(hud, (car_x2 + 3, mirror_offset_y), (car_x2 + mirror_w + 3, mirror_offset_y + mirror_h), (100, 100, 100), 1)
+        wheel_w, wheel_h = 10, 35
+        wheel_color = (40, 40, 40)
+        cv2.rectangle(hud, (car_x1 - wheel_w, car_y1 + 35), (car_x1, car_y1 + 35 + wheel_h), wheel_color, -1)
+        cv2.rectangle(hud, (car_x2, car_y1 + 35), (car_x2 + wheel_w, car_y1 + 35 + wheel_h), wheel_color, -1)
+        cv2.rectangle(hud, (car_x1 - wheel_w, car_y2 - 70), (car_x1, car_y2 - 70 + wheel_h), wheel_color, -1)
+        cv2.rectangle(hud, (car_x2, car_y2 - 70), (car_x2 + wheel_w, car_y2 - 70 + wheel_h), wheel_color, -1)
+        cv2.putText(hud, "T", (cx - 6, car_y1 + 18), FONT, 0.6, (255, 255, 255), 2, cv2.LINE_AA)
+        cv2.putText(hud, "Model 3", (cx - 32, car_y2 + 30), FONT, 0.5, (200, 200, 200), 1, cv2.LINE_AA)
+        cv2.arrowedLine(hud, (cx, car_y1 + 100), (cx, car_y1 + 40), (255, 200, 0), 3, tipLength=0.3)
+        cv2.arrowedLine(hud, (cx, car_y1 - 10), (cx, car_y1 - 40), (220, 220, 220), 2, tipLength=0.4)
+        cv2.putText(hud, "FRONT", (cx - 38, car_y1 - 48), FONT, 0.6, (220, 220, 220), 2, cv2.LINE_AA)
+        cv2.arrowedLine(hud, (cx, car_y2 + 10), (cx, car_y2 + 40), (220, 220, 220), 2, tipLength=0.4)
+        cv2.putText(hud, "REAR", (cx - 28, car_y2 + 60), FONT, 0.6, (220, 220, 220), 2, cv2.LINE_AA)
+        strip_y = self.strip_y
+        cv2.rectangle(hud, (block_x, strip_y), (block_x + block_w, strip_y + 80), (30, 30, 30), -1)
+        for label, x, y in (("Left", block_x + 20, strip_y + 30), ("Right", block_x + 20, strip_y + 60),
+                            ("Prox", block_x + 290, strip_y + 30), ("Lane", block_x + 290, strip_y + 60)):
+            cv2.putText(hud, label, (x, y), FONT, 0.6, (180, 180, 180), 2, cv2.LINE_AA)
+        panel_x, panel_y, panel_w, panel_h = self.panel_x, self.panel_y, self.panel_w, self.panel_h
+        cv2.rectangle(hud, (panel_x, panel_y), (panel_x + panel_w, panel_y + panel_h), (35, 35, 35), -1)
+        cv2.putText(hud, "Vehicle Controls", (panel_x + 16, panel_y + 32), FONT, 0.8, (240, 240, 240), 2, cv2.LINE_AA)
+        cv2.putText(hud, "W: Throttle | S: Brake | A/D: Steer | SPACE: Reverse | ESC: Exit",
+                    (panel_x + 16, panel_y + 60), FONT, 0.52, (200, 200, 200), 1, cv2.LINE_AA)
+        for label, y in (("Throttle", panel_y + 110), ("Brake", panel_y + 136), ("Steer", panel_y + 162)):
+            x = panel_x + 16
+            cv2.rectangle(hud, (x, y), (x + 180, y + 18), (60, 60, 60), -1, cv2.LINE_AA)
+            cv2.putText(hud, label, (x + 190, y + 14), FONT, 0.52, (200, 200, 200), 1, cv2.LINE_AA)
+
+    def render(self, left_state, right_state, lane_state, prox_alert,
+               hud_speed_kph=0.0, hud_throttle=0.0, hud_brake=0.0,
+               hud_steer=0.0, hud_reverse=False, overlay=None):
+        """Return ``(image, changed)``; the image is only redrawn when a displayed value changed.
+
+        ``overlay`` is an optional tuple of text rows (the performance
+        overlay) drawn as a small table in the top-left corner of the vehicle block.
+        """
+        lane_flash = bool(lane_state) and (int(time.time() * 2) % 2 == 0)
+        bar_fills = tuple(int(max(0, min(180, 180 * frac)))
+                          for frac in (hud_throttle, hud_brake, (hud_steer + 1) / 2.0))
+        speed_text = f"Speed: {hud_speed_kph:5.1f} km/h"
+        key = (left_state, right_state, bool(lane_state), prox_alert, lane_flash,
+               speed_text, bar_fills, bool(hud_reverse), overlay)
+        if key == self.last_key:
+            return self.image, False
+        np.copyto(self.image, self.base)
+        self._draw_dynamic(self.image, left_state, right_state, lane_state, prox_alert,
+                           lane_flash, speed_text, bar_fills, hud_reverse)
+        if overlay:
+            self._draw_overlay(self.image, overlay)
+        self.last_key = key
+        return self.image, True
+
+    def _draw_dynamic(self, hud, left_state, right_state, lane_state, prox_alert,
+                      lane_flash, speed_text, bar_fills, hud_reverse):
+        W = self.WIDTH
+        block_x, strip_y = self.block_x, self.strip_y
+        cx, car_x1, car_y1, car_x2, car_y2 = self.cx, self.car_x1, self.car_y1, self.car_x2, self.car_y2
+        header_text = "WARNING!" if (left_state == "warn" or right_state == "warn" or lane_state or prox_alert == "warn") \
+                      else ("CAUTION" if (left_state == "near" or right_state == "near" or prox_alert == "near") else "ALL CLEAR")
+        header_color = (0, 0, 255) if header_text == "WARNING!" else ((0, 215, 255) if header_text == "CAUTION" else (0, 200, 0))
+        cv2.putText(hud, header_text, (W - 240, 40), FONT, 1.0, header_color, 3, cv2.LINE_AA)
+        cv2.rectangle(hud, (car_x1 - 80, car_y1 + 50), (car_x1 - 15, car_y2 - 50), _alert_color(left_state, (80, 80, 80)), -1)
+        cv2.putText(hud, "LEFT", (car_x1 - 70, cx - 20), FONT, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+        cv2.rectangle(hud, (car_x2 + 15, car_y1 + 50), (car_x2 + 80, car_y2 - 50), _alert_color(right_state, (80, 80, 80)), -1)
+        cv2.putText(hud, "RIGHT", (car_x2 + 20, cx - 20), FONT, 0.5, (255, 255, 255), 1, cv2.LINE_AA)
+        if lane_flash:
+            cv2.putText(hud, "LANE DEPARTURE", (cx - 130, car_y1 + self.body_h // 2), FONT, 1.0, (0, 0, 255), 3, cv2.LINE_AA)
+        for value, x, y, color in ((left_state.upper(), block_x + 20, strip_y + 30, _alert_color(left_state, (200, 200, 200))),
+                                   (right_state.upper(), block_x + 20, strip_y + 60, _alert_color(right_state, (200, 200, 200))),
+                                   (prox_alert.upper(), block_x + 290, strip_y + 30, _alert_color(prox_alert, (200, 200, 200))),
+                                   ("ACTIVE" if lane_state else "OK", block_x + 290, strip_y + 60,
+                                    (0, 0, 255) if lane_state else (200, 200, 200))):
+            cv2.putText(hud, value, (x + 120, y), FONT, 0.7, color, 2, cv2.LINE_AA)
+        panel_x, panel_y, panel_w = self.panel_x, self.panel_y, self.panel_w
+        cv2.putText(hud, speed_text, (panel_x + 16, panel_y + 92), FONT, 0.65, (180, 220, 255), 2, cv2.LINE_AA)
+        for wfill, y, color in zip(bar_fills, (panel_y + 110, panel_y + 136, panel_y + 162),
+                                   ((120, 220, 120), (220, 120, 120), (120, 180, 240))):
+            x = panel_x + 16
+            cv2.rectangle(hud, (x, y), (x + wfill, y + 18), color, -1, cv2.LINE_AA)
+        rev_text = "Reverse: ON" if hud_reverse else "Reverse: OFF"
+        rev_col = (0, 165, 255) if hud_reverse else (180, 180, 180)
+        cv2.putText(hud, rev_text, (panel_x + 320, panel_y + 92), FONT, 0.7, rev_col, 2, cv2.LINE_AA)
+        status_color = (0, 0, 255) if (left_state == "warn" or right_state == "warn" or lane_state) else \
+                       ((0, 215, 255) if (left_state == "near" or right_state == "near" or prox_alert == "near") else (120, 220, 120))
+        cv2.circle(hud, (panel_x + panel_w - 22, panel_y + 24), 10, status_color, -1, cv2.LINE_AA)
+
+    def _draw_overlay(self, hud, rows):
+        x, y = self.block_x + 10, self.block_y + 18
+        for i, row in enumerate(rows):
+            for cell, dx in zip(row, (0, 78, 118, 158)):
+                cv2.putText(hud, cell, (x + dx, y + 11 * i), FONT, 0.32, (150, 230, 150), 1, cv2.LINE_AA)
+
+class CameraPanelCompositor:
+    """Persistent camera panel; feeds are resized straight into their tile of the panel."""
+
+    TITLE_H, HEADER_H, GAP = 40, 22, 10
+
+    def __init__(self, titles, layout=CAMERA_PANEL_LAYOUT, tile_size=CAMERA_TILE_SIZE, target=None):
+        self.titles = list(titles)
+        self.cols, self.rows = self._grid(layout, len(self.titles))
+        self.tile_w, self.tile_h = tile_size
+        gap, title_h, header_h = self.GAP, self.TITLE_H, self.HEADER_H
+        self.width, self.height = self.panel_size(len(self.titles), layout, tile_size)
+        self.panel = target if target is not None else np.zeros((self.height, self.width, 3), dtype=np.uint8)
+        self.no_feed = np.zeros((self.tile_h, self.tile_w, 3), dtype=np.uint8)
+        cv2.putText(self.no_feed, "No Feed", (self.tile_w // 2 - 72, self.tile_h // 2 + 8),
+                    FONT, 0.6, (200, 200, 200), 2, cv2.LINE_AA)
+        self.tiles = []
+        for i in range(len(self.titles)):
+            tx = gap + (i % self.cols) * (self.tile_w + gap)
+            ty = title_h + header_h + (i // self.cols) * (self.tile_h + gap + header_h)
+            self.tiles.append(self.panel[ty:ty + self.tile_h, tx:tx + self.tile_w])
+        self._draw_chrome()
+        self.shown = [None] * len(self.titles)
+
+    @classmethod
+    def panel_size(cls, count, layout=CAMERA_PANEL_LAYOUT, tile_size=CAMERA_TILE_SIZE):
+        """``(width, height)`` of the panel for ``count`` cameras, e.g. to allocate a shared canvas."""
+        cols, rows = cls._grid(layout, count)
+        tile_w, tile_h = tile_size
+        return (tile_w * cols + cls.GAP * (cols + 1),
+                cls.TITLE_H + (tile_h + cls.HEADER_H) * rows + cls.GAP * (rows - 1))
+
+    @staticmethod
+    def _grid(layout, count):
+        """Parse a ``"ROWSxCOLS"`` layout into ``(cols, rows)``; ``"auto"`` picks a near-square grid."""
+        if layout == "auto":
+            cols = int(np.ceil(np.sqrt(count)))
+            return cols, int(np.ceil(count / float(cols)))
+        rows, cols = (int(v) for v in layout.lower().split("x"))
+        if cols * rows < count:
+            raise ValueError(f"Camera panel layout {layout} cannot fit {count} cameras")
+        return cols, rows
+
+    def _draw_chrome(self):
+        panel, gap, title_h, header_h = self.panel, self.GAP, self.TITLE_H, self.HEADER_H
+        panel[:] = 0
+        cv2.rectangle(panel, (0, 0), (self.width, title_h), (35, 35, 35), -1)
+        cv2.putText(panel, "Camera Feeds", (20, 28), FONT, 0.8, (240, 240, 240), 2, cv2.LINE_AA)
+        for i, title in enumerate(self.titles):
+            tx = gap + (i % self.cols) * (self.tile_w + gap)
+            ty = title_h + header_h + (i // self.cols) * (self.tile_h + gap + header_h)
+            cv2.rectangle(panel, (tx - 2, ty - header_h), (tx + self.tile_w + 2, ty - 2), (35, 35, 35), -1)
+            cv2.putText(panel, title, (tx + 8, ty - 8), FONT, 0.55, (220, 220, 220), 1, cv2.LINE_AA)
+
+    def compose(self, frames, versions=None):
+        """Update tiles from ``frames`` and return ``(panel, changed)``.
+
+        ``versions`` holds one change token per frame (e.g. the CARLA
+        frame id); a tile whose token matches the last composite is left as is.
+        Without tokens every live feed is redrawn.
+        """
+        changed = False
+        for i, (tile, frame) in enumerate(zip(self.tiles, frames)):
+            if frame is None:
+                if self.shown[i] != "no_feed":
+                    np.copyto(tile, self.no_feed)
+                    self.shown[i] = "no_feed"
+                    changed = True
+                continue
+            version = versions[i] if versions is not None else None
+            if version is not None and self.shown[i] == ("frame", version):
+                continue
+            cv2.resize(frame, (self.tile_w, self.tile_h), dst=tile, interpolation=cv2.INTER_NEAREST)
+            self.shown[i] = ("frame", version)
+            changed = True
+        return self.panel, changed
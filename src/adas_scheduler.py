@@ -0,0 +1,117 @@
+#!/usr/bin/env python
+"""
+ADAS Detection Scheduler
+Chooses a detection interval per camera each tick from ego speed, steering,
+the side's alert level and the measured inference latency, so inference is
+spent where the risk is.
+"""
+
+import csv
+import math
+import time
+import datetime
+import collections
+from adas_config import (DETECTION_SKIP_FRAMES, TARGET_FPS, ADAPTIVE_DETECTION, DETECTION_MIN_INTERVAL,
+                         DETECTION_MAX_INTERVAL, SCHED_PARKED_KPH, SCHED_HIGHWAY_KPH,
+                         SCHED_STEER_THRESHOLD, SCHED_IDLE_SECONDS, DETECTION_BUDGET_FRACTION)
+from adas_metrics import inference_latency
+
+# Side whose blind spot the ego vehicle steers toward, by steering sign.
+STEER_SIDES = {"left": -1, "right": 1}
+
+class DetectionScheduler:
+    """Per-camera adaptive detection interval in ticks, clamped to the configured min/max.
+
+    ``plan()`` is called once per tick and returns the indices of the sides
+    due for detection. The current interval and the rule that chose it are
+    in ``intervals``/``reasons``; every change is appended to ``events``.
+    """
+
+    def __init__(self, sides, adaptive=ADAPTIVE_DETECTION, base_interval=DETECTION_SKIP_FRAMES,
+                 min_interval=DETECTION_MIN_INTERVAL, max_interval=DETECTION_MAX_INTERVAL,
+                 budget_fraction=DETECTION_BUDGET_FRACTION, history=10000):
+        self.sides = list(sides)
+        self.adaptive = adaptive
+        self.base = base_interval
+        self.min_interval = max(1, int(min_interval))
+        self.max_interval = max(self.min_interval, int(max_interval))
+        self.budget = budget_fraction / float(TARGET_FPS)
+        self.intervals = [self._clamp(base_interval)] * len(self.sides)
+        self.reasons = ["fixed" if not adaptive else "base"] * len(self.sides)
+        self.since = [self.max_interval] * len(self.sides)   # first tick runs detection
+        self.clear_since = [time.time()] * len(self.sides)
+        self.runs = [0] * len(self.sides)
+        self.stale = [0] * len(self.sides)
+        self.ticks = 0
+        self.budget_floor = self.min_interval
+        self.events = collections.deque(maxlen=history)
+
+    def _clamp(self, interval):
+        return max(self.min_interval, min(self.max_interval, int(interval)))
+
+    def _refresh_budget(self):
+        """Smallest interval at which p95 inference time fits the per-tick budget."""
+        pct = inference_latency.percentiles((95,))
+        if pct is not None:
+            self.budget_floor = int(math.ceil(pct[0] / self.budget)) if self.budget > 0 else self.min_interval
+
+    def _choose(self, i, speed_kph, steer, level, now):
+        if level != "clear":
+            self.clear_since[i] = now
+            return self.min_interval, "alert"
+        if steer * STEER_SIDES.get(self.sides[i], 0) > SCHED_STEER_THRESHOLD:
+            return self.min_interval, "steer"
+        if speed_kph < SCHED_PARKED_KPH:
+            interval, reason = self.max_interval, "parked"
+        elif now - self.clear_since[i] > SCHED_IDLE_SECONDS:
+            interval, reason = self.base * 2, "idle"
+        elif speed_kph > SCHED_HIGHWAY_KPH:
+            interval, reason = self.base - 1, "highway"
+        else:
+            interval, reason = self.base, "base"
+        if self.budget_floor > interval:
+            interval, reason = self.budget_floor, "budget"
+        return interval, reason
+
+    def plan(self, speed_kph, steer, levels, now=None, fresh=None):
+        """Advance one tick and return the indices of the sides that should run detection now.
+
+        ``fresh`` flags, per side, whether its camera delivered a frame not yet
+        run through detection; a due side without one waits for the next frame.
+        """
+        now = time.time() if now is None else now
+        self.ticks += 1
+        if self.adaptive and self.ticks % 30 == 1:
+            self._refresh_budget()
+        due = []
+        for i, level in enumerate(levels):
+            if self.adaptive:
+                interval, reason = self._choose(i, speed_kph, steer, level, now)
+                interval = self._clamp(interval)
+                if (interval, reason) != (self.intervals[i], self.reasons[i]):
+                    self.events.append((now, self.sides[i], interval, reason, round(speed_kph, 1), level))
+                    self.intervals[i], self.reasons[i] = interval, reason
+            self.since[i] += 1
+            if self.since[i] >= self.intervals[i] and fresh is not None and not fresh[i]:
+                self.stale[i] += 1
+            elif self.since[i] >= self.intervals[i]:
+                self.since[i] = 0
+                self.runs[i] += 1
+                due.append(i)
+        return due
+
+    def describe(self):
+        """Compact per-side ``side:interval(reason)`` text for the HUD overlay."""
+        return " ".join(f"{side}:{n}({reason})" for side, n, reason in zip(self.sides, self.intervals, self.reasons))
+
+    def stats(self):
+        """Detections run per side against ticks elapsed."""
+        return {"ticks": self.ticks, "runs": dict(zip(self.sides, self.runs)),
+                "stale": dict(zip(self.sides, self.stale)), "changes": len(self.events)}
+
+    def save(self, path):
+        """Write the recorded interval changes to a CSV file."""
+        with open(path, "w", newline="") as f:
+            writer = csv.writer(f)
+            writer.writerow(["time", "side", "interval_ticks", "reason", "speed_kph", "alert_level"])
+            writer.writerows([datetime.datetime.fromtimestamp(e[0])] + list(e[1:]) for e in self.events)
@@ -0,0 +1,228 @@
+#!/usr/bin/env python
+"""
+ADAS Telemetry Bus
+Publishes a fixed-layout ADAS state record into a named shared-memory
+segment every tick, guarded by a sequence counter (seqlock), so other
+infotainment processes (cluster display, logging daemon, diagnostics) can
+read a consistent snapshot without locks, sockets or CSV parsing. The
+publisher never waits for readers. Alert levels are integer enums
+(``LEVEL_CODES``). Optionally the segment also names the shared camera
+FrameBuffers, which readers map directly and read without copying.
+
+Requires Python 3.8+ (multiprocessing.shared_memory).
+
+Usage (reader):
+    python src/adas_telemetry.py            # print live telemetry
+"""
+
+import os
+import time
+import argparse
+import numpy as np
+from adas_config import TELEMETRY_NAME
+from adas_buffers import FrameBuffer, untrack_shared_memory
+
+LEVEL_CODES = {"clear": 0, "near": 1, "warn": 2}
+LEVEL_NAMES = ("clear", "near", "warn")
+CAMERA_SIDES = ("left", "right", "front", "rear")
+MAGIC = 0x53414441   # "ADAS"
+LAYOUT_VERSION = 1
+
+# Written once when the segment is created.
+HEADER_DTYPE = np.dtype([
+    ("magic", "<u4"),
+    ("version", "<u4"),
+    ("pid", "<i4"),                  # publisher process id
+    ("camera_shm", "S32", (4,)),     # FrameBuffer segment per CAMERA_SIDES entry ("" if not shared)
+    ("camera_size", "<i4", (4, 3)),  # width, height, slots
+])
+
+# Rewritten every tick; ``seq`` is odd while the publisher is writing.
+RECORD_DTYPE = np.dtype([
+    ("seq", "<u8"),
+    ("frame_id", "<i8"),             # CARLA world frame of this tick
+    ("time", "<f8"),                 # time.time() at publish
+    ("speed_kph", "<f4"),
+    ("throttle", "<f4"),
+    ("brake", "<f4"),
+    ("steer", "<f4"),
+    ("reverse", "u1"),
+    ("lane_departure", "u1"),
+    ("blindspot", "u1", (4,)),       # LEVEL_CODES per CAMERA_SIDES entry
+    ("proximity", "u1"),             # LEVEL_CODES
+    ("distance_m", "<f4"),           # nearest vehicle, NaN if none
+    ("ttc_s", "<f4"),                # time to collision ahead, NaN if none
+    ("camera_frame", "<i8", (4,)),   # newest CARLA frame id per camera, -1 if none
+])
+
+def _value(value):
+    return np.nan if value is None else value
+
+def _publisher_alive(shm):
+    """Whether the process that created telemetry segment ``shm`` may still be running.
+
+    False only for an ADAS telemetry segment whose publisher pid no longer
+    exists; on Windows a segment disappears with its last handle, so an
+    existing one always has a live owner.
+    """
+    if os.name == "nt" or shm.size < HEADER_DTYPE.itemsize:
+        return True
+    header = np.ndarray((), dtype=HEADER_DTYPE, buffer=shm.buf)
+    ours = int(header["magic"]) == MAGIC and int(header["version"]) == LAYOUT_VERSION
+    pid = int(header["pid"])
+    del header
+    if not ours or pid <= 0:
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+class TelemetryPublisher:
+    """Owner of the telemetry segment; ``publish`` is called once per tick by the ADAS loop."""
+
+    def __init__(self, name=TELEMETRY_NAME, cameras=None):
+        from multiprocessing import shared_memory
+        size = HEADER_DTYPE.itemsize + RECORD_DTYPE.itemsize
+        try:
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        except FileExistsError:
+            existing = shared_memory.SharedMemory(name=name)
+            alive = _publisher_alive(existing)
+            existing.close()
+            if alive:
+                untrack_shared_memory(existing)
+                raise RuntimeError(f"Shared memory '{name}' already exists and may be in use by another "
+                                   f"publisher; stop it or set a different TELEMETRY_NAME")
+            # Left behind by a publisher that exited without closing it.
+            existing.unlink()
+            self.shm = shared_memory.SharedMemory(name=name, create=True, size=size)
+        self.name = name
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        self.record = np.ndarray((), dtype=RECORD_DTYPE, buffer=self.shm.buf, offset=HEADER_DTYPE.itemsize)
+        self.record[...] = np.zeros((), dtype=RECORD_DTYPE)
+        self.record["camera_frame"] = -1
+        self.header[...] = np.zeros((), dtype=HEADER_DTYPE)
+        for i, side in enumerate(CAMERA_SIDES):
+            buffer = (cameras or {}).get(side)
+            if buffer is not None and buffer.shm is not None:
+                shm_name, width, height, slots = buffer.spec
+                self.header["camera_shm"][i] = shm_name.encode()
+                self.header["camera_size"][i] = (width, height, slots)
+        self.header["pid"] = os.getpid()
+        self.header["version"] = LAYOUT_VERSION
+        self.header["magic"] = MAGIC
+        self.published = 0
+
+    def publish(self, frame_id, speed_kph, control, blindspot_states, lane_state, prox_state, camera_frames=None):
+        """Write one tick's state; ``blindspot_states`` maps side -> state dict."""
+        r = self.record
+        r["seq"] += 1
+        r["frame_id"] = frame_id if frame_id is not None else -1
+        r["time"] = time.time()
+        r["speed_kph"] = speed_kph
+        r["throttle"], r["brake"], r["steer"] = control.throttle, control.brake, control.steer
+        r["reverse"] = control.reverse
+        r["lane_departure"] = lane_state.get("active", False)
+        r["blindspot"] = [LEVEL_CODES[blindspot_states[side]["level"]] if side in blindspot_states else 0
+                          for side in CAMERA_SIDES]
+        r["proximity"] = LEVEL_CODES[prox_state.get("level", "clear")]
+        r["distance_m"] = _value(prox_state.get("distance"))
+        r["ttc_s"] = _value(prox_state.get("ttc"))
+        if camera_frames is not None:
+            r["camera_frame"] = camera_frames
+        r["seq"] += 1
+        self.published += 1
+
+    def close(self):
+        self.header = self.record = None
+        self.shm.close()
+        self.shm.unlink()
+
+class TelemetryReader:
+    """Attaches to a publisher's segment from another process.
+
+    ``snapshot()`` copies the record into a reader-owned array (no allocation
+    per call) and retries while the publisher is mid-write; ``frames()``
+    returns zero-copy FrameRefs of the shared camera buffers, if published.
+    """
+
+    def __init__(self, name=TELEMETRY_NAME):
+        from multiprocessing import shared_memory
+        self.shm = shared_memory.SharedMemory(name=name)
+        untrack_shared_memory(self.shm)
+        self.header = np.ndarray((), dtype=HEADER_DTYPE, buffer=self.shm.buf)
+        if int(self.header["magic"]) != MAGIC or int(self.header["version"]) != LAYOUT_VERSION:
+            self.shm.close()
+            raise ValueError(f"Shared memory '{name}' is not an ADAS telemetry segment (layout {LAYOUT_VERSION})")
+        self.record = np.ndarray((), dtype=RECORD_DTYPE, buffer=self.shm.buf, offset=HEADER_DTYPE.itemsize)
+        self.out = np.zeros((), dtype=RECORD_DTYPE)
+        self.buffers = None
+
+    def snapshot(self, retries=100):
+        """Latest consistent record, or None if nothing was published yet (or the writer kept racing us)."""
+        for _ in range(retries):
+            seq = int(self.record["seq"])
+            if seq == 0:
+                return None
+            if seq & 1:
+                continue
+            np.copyto(self.out, self.record)
+            if int(self.record["seq"]) == seq:
+                return self.out
+        return None
+
+    def frames(self):
+        """``{side: FrameRef}`` for each camera the publisher shares; frames are views into shared memory."""
+        if self.buffers is None:
+            self.buffers = {}
+            for i, side in enumerate(CAMERA_SIDES):
+                shm_name = self.header["camera_shm"][i].decode()
+                if shm_name:
+                    width, height, slots = (int(v) for v in self.header["camera_size"][i])
+                    self.buffers[side] = FrameBuffer.attach((shm_name, width, height, slots), track=False)
+        return {side: buffer.read() for side, buffer in self.buffers.items()}
+
+    def close(self):
+        for buffer in (self.buffers or {}).values():
+            buffer.close()
+        self.header = self.record = self.out = None
+        self.shm.close()
+
+def describe(record):
+    """One-line text form of a snapshot."""
+    levels = " ".join(f"{side}={LEVEL_NAMES[code]}" for side, code in zip(CAMERA_SIDES, record["blindspot"]))
+    distance = float(record["distance_m"])
+    return (f"frame {int(record['frame_id'])}  {float(record['speed_kph']):5.1f} km/h  "
+            f"steer {float(record['steer']):+.2f}  {levels}  lane={'yes' if record['lane_departure'] else 'no'}  "
+            f"prox={LEVEL_NAMES[record['proximity']]}" + (f" ({distance:.1f} m)" if not np.isnan(distance) else ""))
+
+def main():
+    parser = argparse.ArgumentParser(description="Print live ADAS telemetry from shared memory")
+    parser.add_argument("--name", default=TELEMETRY_NAME, help="shared-memory segment name")
+    parser.add_argument("--rate", type=float, default=5.0, help="snapshots per second")
+    args = parser.parse_args()
+    try:
+        reader = TelemetryReader(args.name)
+    except FileNotFoundError:
+        print(f"✗ No telemetry segment '{args.name}' (is the dashboard running with TELEMETRY_ENABLED?)")
+        return
+    print(f"✓ Attached to telemetry segment '{args.name}' (Ctrl+C to stop)")
+    last_seq = None
+    try:
+        while True:
+            record = reader.snapshot()
+            if record is not None and int(record["seq"]) != last_seq:
+                last_seq = int(record["seq"])
+                print(describe(record))
+            time.sleep(1.0 / max(args.rate, 0.1))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        reader.close()
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,115 @@
+#!/usr/bin/env python
+"""
+ADAS Blind-Spot Tracker
+IoU-associated constant-velocity Kalman tracks for vehicle boxes of one
+mirror camera, so boxes can be predicted on ticks without inference and
+approach speed can be read from box-height growth.
+"""
+
+import itertools
+import numpy as np
+from adas_config import TRACK_IOU_THRESHOLD, TRACK_MAX_AGE
+
+# State is (cx, cy, w, h, vcx, vcy, vw, vh) in pixels and pixels per second.
+_H = np.eye(4, 8)
+_track_ids = itertools.count(1)
+
+def iou_matrix(a, b):
+    """Pairwise IoU of ``(N, 4)`` and ``(M, 4)`` xyxy boxes."""
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+class Track:
+    """One tracked vehicle box with its Kalman state and last detection label/confidence."""
+
+    def __init__(self, box, label, confidence, now):
+        x1, y1, x2, y2 = box
+        self.id = next(_track_ids)
+        self.x = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1, 0, 0, 0, 0], dtype=np.float64)
+        scale = max(self.x[3], 1.0)
+        self.P = np.diag(np.square([0.1 * scale] * 4 + [scale] * 4))
+        self.label = label
+        self.confidence = confidence
+        self.hits = 1
+        self.last_seen = now
+
+    def predict(self, dt):
+        F = np.eye(8)
+        F[:4, 4:] = np.eye(4) * dt
+        q = np.square([0.05 * max(self.x[3], 1.0)] * 4 + [0.5 * max(self.x[3], 1.0)] * 4) * dt
+        self.x = F @ self.x
+        self.x[2:4] = np.maximum(self.x[2:4], 1.0)
+        self.P = F @ self.P @ F.T + np.diag(q)
+
+    def correct(self, box, label, confidence, now):
+        x1, y1, x2, y2 = box
+        z = np.array([(x1 + x2) / 2, (y1 + y2) / 2, x2 - x1, y2 - y1])
+        R = np.diag(np.square([0.05 * max(z[3], 1.0)] * 4))
+        S = _H @ self.P @ _H.T + R
+        K = self.P @ _H.T @ np.linalg.inv(S)
+        self.x = self.x + K @ (z - _H @ self.x)
+        self.P = (np.eye(8) - K @ _H) @ self.P
+        self.label = label
+        self.confidence = confidence
+        self.hits += 1
+        self.last_seen = now
+
+def track_arrays(tracks):
+    """``(N, 4)`` xyxy boxes and ``(N,)`` growth rates of ``tracks`` as arrays."""
+    if not tracks:
+        return np.zeros((0, 4)), np.zeros(0)
+    x = np.array([t.x for t in tracks])
+    half = x[:, 2:4] / 2
+    boxes = np.concatenate([x[:, :2] - half, x[:, :2] + half], axis=1)
+    return boxes, x[:, 7] / np.maximum(x[:, 3], 1.0)
+
+class BoxTracker:
+    """Per-camera multi-object tracker; not thread-safe, so only the main loop updates it."""
+
+    def __init__(self, iou_threshold=TRACK_IOU_THRESHOLD, max_age=TRACK_MAX_AGE):
+        self.iou_threshold = iou_threshold
+        self.max_age = max_age
+        self.tracks = []
+        self.time = None
+
+    def _advance(self, now):
+        if self.time is not None and now > self.time:
+            dt = now - self.time
+            for track in self.tracks:
+                track.predict(dt)
+        self.time = now if self.time is None else max(self.time, now)
+        self.tracks = [t for t in self.tracks if now - t.last_seen <= self.max_age]
+
+    def predict(self, now):
+        """Move every track to ``now`` and drop tracks unseen for longer than ``max_age``."""
+        self._advance(now)
+        return list(self.tracks)
+
+    def update(self, boxes, labels, confidences, now):
+        """Associate ``(N, 4)`` xyxy detections with tracks by greedy IoU; return the matched/new tracks."""
+        self._advance(now)
+        updated = []
+        unmatched = set(range(len(boxes)))
+        if len(boxes) and self.tracks:
+            ious = iou_matrix(track_arrays(self.tracks)[0], np.asarray(boxes, dtype=np.float64))
+            free_tracks = set(range(len(self.tracks)))
+            for flat in np.argsort(ious, axis=None)[::-1]:
+                ti, di = np.unravel_index(flat, ious.shape)
+                if ious[ti, di] < self.iou_threshold:
+                    break
+                if ti in free_tracks and di in unmatched:
+                    self.tracks[ti].correct(boxes[di], labels[di], confidences[di], now)
+                    updated.append(self.tracks[ti])
+                    free_tracks.discard(ti)
+                    unmatched.discard(di)
+        for di in sorted(unmatched):
+            track = Track(boxes[di], labels[di], confidences[di], now)
+            self.tracks.append(track)
+            updated.append(track)
+        return updated
@@ -9,77 +9,213 @@ import numpy as np
 import cv2
 import carla
 import time
-import datetime
-from adas_config import model, writer, audio_alerts, VEHICLE_KEYWORDS, WARNING_CLEAR_TIME
+from adas_config import (get_backend, get_logger, get_audio, vehicle_class_ids, WARNING_CLEAR_TIME,
+                         DETECTION_INPUT_SIZE, BLINDSPOT_ROI, BLINDSPOT_TRACKING, TRACK_APPROACH_RATE,
+                         MOTION_GATING, PROXIMITY_WARN_DISTANCE, PROXIMITY_NEAR_DISTANCE)
+from adas_proximity import ProximityEngine
+from adas_tracker import BoxTracker, track_arrays
+from adas_motion import MotionGate
+from adas_metrics import inference_latency, alert_latency
+
+ALERT_LEVELS = ("clear", "near", "warn")
+# Horizontal alert zone per camera, as fractions of the frame width
+BLINDSPOT_ZONES = {"left": (0.05, 0.35), "right": (0.65, 0.95), "front": (0.3, 0.7), "rear": (0.3, 0.7)}
+_class_tables = {}
+_vehicle_blueprints = {}
 
 def detect_blindspot_frame(array, state, side="left"):
-    """Run YOLOv5 on an already-decoded numpy image; update state & CSV with timestamp."""
-    if array is None:
-        return
-    h, w = array.shape[:2]
-    scale = 0.5
-    small_array = cv2.resize(array, (int(w * scale), int(h * scale)))
-    rgb = cv2.cvtColor(small_array, cv2.COLOR_BGR2RGB)
-    results = model(rgb, size=160)
+    """Run YOLOv5 on one side's ROI of a BGR frame; update its state and queue its detections to the logger."""
+    detect_blindspot_frames([array], [state], [side])
+
+def detect_blindspot_frames(arrays, states, sides, captured=None, now=None):
+    """Run YOLOv5 once on a batch of camera frames; update each side's state and queue log rows.
+
+    ``captured`` optionally holds each frame's perf_counter() capture time,
+    used to record frame-to-alert latency when a side's level changes.
+    ``now`` overrides the clock used for alert clearing (e.g. recorded
+    sensor time during replay).
+    """
+    if captured is None:
+        captured = [None] * len(arrays)
+    results = infer_blindspot_frames(arrays, states, sides, now)
+    for array, state, side, stamp, (detections, reused) in zip(arrays, states, sides, captured, results):
+        if array is not None:
+            update_blindspot_state(detections, array.shape, state, side, stamp, now, log=not reused)
+
+def infer_blindspot_frames(arrays, states, sides, now=None):
+    """Run YOLOv5 once on a batch of camera frames without changing any alert state.
+
+    Returns one ``(detections, reused)`` pair per frame, with boxes in
+    full-frame coordinates (``(None, False)`` for a missing frame). With
+    ``MOTION_GATING`` a side whose ROI has not changed since its last
+    inference reuses that result. Alert state is only read, so a background
+    thread can run this while the tick loop applies results.
+    """
+    current_time = time.time() if now is None else now
+    results = [(None, False)] * len(arrays)
+    batch = []
+    for i, (array, state, side) in enumerate(zip(arrays, states, sides)):
+        if array is None:
+            continue
+        previous = state.get("detections")
+        if MOTION_GATING and previous is not None:
+            gate = state.setdefault("motion", MotionGate())
+            if not gate.should_infer(detection_roi(array, side), current_time):
+                results[i] = (previous, True)
+                continue
+        batch.append((i, array, side))
+    if not batch:
+        return results
+    backend = get_backend()
+    rgb = getattr(backend, "input_format", "rgb") == "rgb"
+    offsets = []
+    inputs = []
+    for _, array, side in batch:
+        image, offset = crop_for_detection(array, side, rgb)
+        inputs.append(image)
+        offsets.append(offset)
+    infer_start = time.perf_counter()
+    detections = backend.infer(inputs, DETECTION_INPUT_SIZE)
+    inference_latency.record(time.perf_counter() - infer_start)
+    for j, (i, _, _) in enumerate(batch):
+        if j < len(detections):
+            results[i] = (detections[j] + offsets[j], False)
+    return results
+
+def crop_for_detection(array, side, rgb=True):
+    """Crop a BGR frame to the side's ROI; returns the crop and the offset mapping boxes back.
+
+    With ``rgb`` the crop is an RGB copy; otherwise it is a BGR view of
+    ``array`` for backends that convert while preprocessing.
+    """
+    x0, y0, x1, y1 = _roi_bounds(side, array.shape)
+    offset = np.array([x0, y0, x0, y0, 0, 0], dtype=np.float32)
+    roi = array[y0:y1, x0:x1]
+    return (cv2.cvtColor(roi, cv2.COLOR_BGR2RGB) if rgb else roi), offset
+
+def detection_roi(array, side):
+    """View of a frame's detection ROI for ``side`` (no copy)."""
+    x0, y0, x1, y1 = _roi_bounds(side, array.shape)
+    return array[y0:y1, x0:x1]
+
+def _roi_bounds(side, shape):
+    """Pixel bounds ``(x0, y0, x1, y1)`` of a side's detection ROI in a frame of ``shape``."""
+    h, w = shape[:2]
+    roi = BLINDSPOT_ROI.get(side)
+    if roi is None:
+        return 0, 0, w, h
+    x0, y0, x1, y1 = roi
+    return int(x0 * w), int(y0 * h), int(round(x1 * w)), int(round(y1 * h))
+
+def set_class_names(names):
+    """Build the class tables from a model's class names (e.g. sent back by detection worker processes)."""
+    items = dict(names.items() if isinstance(names, dict) else enumerate(names))
+    count = max(items) + 1
+    vehicle = np.zeros(count, dtype=bool)
+    vehicle[vehicle_class_ids(items)] = True
+    _class_tables["vehicle"] = vehicle
+    _class_tables["labels"] = np.array([str(items.get(i, "")).lower() for i in range(count)], dtype=object)
+
+def _class_table():
+    """Vehicle mask and lowercase label per class id, built once from the backend's class names."""
+    if not _class_tables:
+        set_class_names(get_backend().names)
+    return _class_tables["vehicle"], _class_tables["labels"]
+
+def _box_levels(boxes, shape, side, growth=None):
+    """Alert level index per ``(N, 4)`` full-frame box: 1 (near) inside the zone, 2 (warn) if also tall or approaching."""
+    sh, sw = shape[:2]
+    zone_x0, zone_x1 = BLINDSPOT_ZONES.get(side, BLINDSPOT_ZONES["right"])
+    center_x = (boxes[:, 0] + boxes[:, 2]) / 2
+    in_zone = (center_x > zone_x0 * sw) & (center_x < zone_x1 * sw)
+    warn = boxes[:, 3] - boxes[:, 1] > 0.25 * sh
+    if growth is not None:
+        warn |= growth > TRACK_APPROACH_RATE
+    return in_zone * (1 + warn)
+
+def update_blindspot_state(detections, shape, state, side, captured=None, now=None, log=True):
+    """Classify one frame's detections into an alert level and update its side's state.
+
+    ``log=False`` is used when a previous result is reused, so its rows are not logged twice.
+    """
     alert_level = "clear"
-    current_time = time.time()
-    if len(results.xyxy) > 0 and results.xyxy[0] is not None:
-        detections = results.xyxy[0].cpu().numpy()
-        names = model.names
-        for det in detections:
-            x1, y1, x2, y2, conf, cls_id = det
-            label = names[int(cls_id)].lower()
-            if any(k in label for k in VEHICLE_KEYWORDS):
-                sh, sw = small_array.shape[:2]
-                box_center_x = (x1 + x2) / 2
-                box_height = y2 - y1
-                if side == "left":
-                    if 0.05 * sw < box_center_x < 0.35 * sw:
-                        alert_level = "near"
-                        if box_height > 0.25 * sh: alert_level = "warn"
-                else:
-                    if 0.65 * sw < box_center_x < 0.95 * sw:
-                        alert_level = "near"
-                        if box_height > 0.25 * sh: alert_level = "warn"
-                writer.writerow([datetime.datetime.now(), label, float(conf),
-                                 side, alert_level, "", "", ""])
+    current_time = time.time() if now is None else now
+    state["detections"] = detections
+    if detections is not None:
+        vehicle, labels = _class_table()
+        cls_ids = detections[:, 5].astype(np.intp)
+        keep = vehicle[np.clip(cls_ids, 0, len(vehicle) - 1)]
+        boxes, confidences, names = detections[keep, :4], detections[keep, 4], labels[cls_ids[keep]]
+        if BLINDSPOT_TRACKING:
+            # Publish the shape before the tracker: update_blindspot_tracks needs both.
+            state["shape"] = shape
+            tracker = state.setdefault("tracker", BoxTracker())
+            updated = tracker.update(boxes, names, confidences, current_time)
+            updated_boxes, updated_growth = track_arrays(updated)
+            levels = _box_levels(updated_boxes, shape, side, updated_growth)
+            rows = [(t.label, float(t.confidence), side, ALERT_LEVELS[level], t.id)
+                    for t, level in zip(updated, levels)]
+            tracked_boxes, growth = track_arrays(tracker.predict(current_time))
+            levels = _box_levels(tracked_boxes, shape, side, growth)
+        else:
+            levels = _box_levels(boxes, shape, side)
+            rows = [(name, float(conf), side, ALERT_LEVELS[level], None)
+                    for name, conf, level in zip(names, confidences, levels)]
+        if len(levels):
+            alert_level = ALERT_LEVELS[levels.max()]
+        if log:
+            get_logger().log_many(rows)
+    _apply_blindspot_level(state, side, alert_level, current_time, captured)
+
+def update_blindspot_tracks(states, sides, now=None):
+    """Predict each side's tracks to ``now`` and refresh its alert level, for ticks without inference."""
+    current_time = time.time() if now is None else now
+    for state, side in zip(states, sides):
+        tracker = state.get("tracker")
+        if tracker is None:
+            continue
+        tracked_boxes, growth = track_arrays(tracker.predict(current_time))
+        levels = _box_levels(tracked_boxes, state["shape"], side, growth)
+        _apply_blindspot_level(state, side, ALERT_LEVELS[levels.max()] if len(levels) else "clear", current_time)
+
+def _apply_blindspot_level(state, side, alert_level, current_time, captured=None):
+    """Apply a new level with the clear-time hold, play the warning sound and record alert latency."""
     previous_level = state.get("level", "clear")
     if alert_level != "clear":
         state["level"] = alert_level
         state["last_detection"] = current_time
-        if alert_level == "warn" and previous_level == "clear" and audio_alerts["blindspot"]:
-            audio_alerts["blindspot"].play()
+        if alert_level == "warn" and previous_level == "clear":
+            get_audio().play("blindspot")
     else:
         if current_time - state.get("last_detection", 0) > WARNING_CLEAR_TIME:
             state["level"] = "clear"
+    if captured and state["level"] != previous_level:
+        alert_latency[side].record(time.perf_counter() - captured)
 
-def check_proximity(world, vehicle, prox_state):
+def check_proximity(world, vehicle, prox_state, engine=None):
     """Check proximity to other vehicles with time-based warning clearing."""
-    ego_loc = vehicle.get_location()
-    ego_vel = vehicle.get_velocity().length()
-    min_dist = 9999
-    rel_speed = 0
+    if engine is None:
+        engine = ProximityEngine(world, vehicle)
+    reading = engine.update()
+    min_dist = reading["distance"] if reading["distance"] is not None else 9999
+    rel_speed = reading["rel_speed"]
     alert = "clear"
     current_time = time.time()
-    for actor in world.get_actors().filter("vehicle.*"):
-        if actor.id == vehicle.id: continue
-        dist = ego_loc.distance(actor.get_location())
-        if dist < min_dist:
-            min_dist = dist
-            rel_speed = actor.get_velocity().length() - ego_vel
-    if min_dist < 8:
+    if min_dist < PROXIMITY_WARN_DISTANCE:
         alert = "warn"
-    elif min_dist < 15:
+    elif min_dist < PROXIMITY_NEAR_DISTANCE:
         alert = "near"
     if min_dist < 9999:
-        writer.writerow([datetime.datetime.now(), "vehicle_ahead", "", "", "",
-                         "", f"{min_dist:.1f}", f"{rel_speed:.1f}"])
+        get_logger().log("vehicle_ahead", distance_m=min_dist, rel_speed_mps=rel_speed)
+    prox_state["distance"] = reading["distance"]
+    prox_state["ahead_distance"] = reading["ahead_distance"]
+    prox_state["ttc"] = reading["ttc"]
     previous_level = prox_state.get("level", "clear")
     if alert != "clear":
         prox_state["level"] = alert
         prox_state["last_detection"] = current_time
-        if alert == "warn" and previous_level == "clear" and audio_alerts["proximity"]:
-            audio_alerts["proximity"].play()
+        if alert == "warn" and previous_level == "clear":
+            get_audio().play("proximity")
     else:
         if current_time - prox_state.get("last_detection", 0) > WARNING_CLEAR_TIME:
             prox_state["level"] = "clear"
@@ -92,22 +228,43 @@ def follow_vehicle_spectator(world, vehicle):
     new_location = transform.transform(offset)
     spectator.set_transform(carla.Transform(new_location, transform.rotation))
 
-def spawn_npc_traffic(world, client, num_vehicles=20):
-    tm_port = 8000
+def vehicle_blueprints(world):
+    """Vehicle blueprints of ``world``, looked up once per world."""
+    if world.id not in _vehicle_blueprints:
+        _vehicle_blueprints[world.id] = list(world.get_blueprint_library().filter('vehicle.*'))
+    return _vehicle_blueprints[world.id]
+
+def spawn_npc_traffic(world, client, num_vehicles=20, tm_port=8000):
+    """Spawn autopilot NPCs on distinct spawn points with one batched spawn+autopilot RPC."""
     tm = client.get_trafficmanager(tm_port)
     tm.set_global_distance_to_leading_vehicle(1.5)
     tm.set_synchronous_mode(True)
     tm.global_percentage_speed_difference(30)
-    bp_lib = world.get_blueprint_library()
+    blueprints = vehicle_blueprints(world)
     spawn_points = list(world.get_map().get_spawn_points())
     random.shuffle(spawn_points)
-    vehicles = []
-    for i in range(num_vehicles):
-        bp = random.choice(bp_lib.filter('vehicle.*'))
-        transform = random.choice(spawn_points)
-        actor = world.try_spawn_actor(bp, transform)
-        if actor:
-            actor.set_autopilot(True, tm_port)
-            vehicles.append(actor)
-            tm.vehicle_percentage_speed_difference(actor, random.randint(10, 40))
+    if num_vehicles > len(spawn_points):
+        print(f"⚠ Only {len(spawn_points)} spawn points for {num_vehicles} requested NPC vehicles")
+    command = carla.command
+    batch = [command.SpawnActor(random.choice(blueprints), transform)
+             .then(command.SetAutopilot(command.FutureActor, True, tm_port))
+             for transform in spawn_points[:num_vehicles]]
+    responses = client.apply_batch_sync(batch, True)
+    errors = [r.error for r in responses if r.error]
+    vehicles = list(world.get_actors([r.actor_id for r in responses if not r.error]))
+    for actor in vehicles:
+        tm.vehicle_percentage_speed_difference(actor, random.randint(10, 40))
+    print(f"✓ Spawned {len(vehicles)}/{num_vehicles} NPC vehicles" +
+          (f" ({len(errors)} failed: {errors[0]})" if errors else ""))
     return vehicles
+
+def destroy_actors(client, actors):
+    """Destroy ``actors`` with one batched RPC; returns the number destroyed."""
+    actors = [a for a in actors if a is not None]
+    if not actors:
+        return 0
+    responses = client.apply_batch_sync([carla.command.DestroyActor(a.id) for a in actors], False)
+    errors = [r.error for r in responses if r.error]
+    if errors:
+        print(f"Warning: Failed to destroy {len(errors)} actor(s): {errors[0]}")
+    return len(actors) - len(errors)
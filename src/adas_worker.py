@@ -0,0 +1,113 @@
+#!/usr/bin/env python
+"""
+ADAS Detection Worker
+Runs blind-spot inference on a background thread so it never stalls the
+simulation tick or HUD rendering; results are applied to the alert states
+by the tick loop (``poll``), so only one thread ever writes them.
+"""
+
+import collections
+import threading
+import time
+from adas_config import DETECTION_QUEUE_DEPTH
+from adas_utils import infer_blindspot_frames, update_blindspot_state
+
+class DetectionWorker:
+    """Background detector that reads the newest frame from each source (latest-frame-wins)."""
+
+    def __init__(self, sides, states, sources, queue_depth=DETECTION_QUEUE_DEPTH):
+        self.sides = list(sides)
+        self.states = list(states)
+        self.sources = list(sources)
+        self.queue_depth = max(1, int(queue_depth))
+        self.pending = collections.deque()
+        self.results = collections.deque()
+        self.cond = threading.Condition()
+        self.running = False
+        self.thread = None
+        self.submitted = 0
+        self.processed = 0
+        self.dropped = 0
+        self.errors = 0
+        self.duplicates = 0
+        self.last_frame = [-1] * len(self.sources)
+
+    def start(self):
+        """Start the worker thread."""
+        if self.thread is not None:
+            return
+        self.running = True
+        self.thread = threading.Thread(target=self._run, name="DetectionWorker", daemon=True)
+        self.thread.start()
+
+    def submit(self, indices=None):
+        """Request a detection pass over the sources at ``indices`` (default all); never blocks the caller.
+
+        Frames are read from the sources when the request is served, so the
+        worker always sees the newest images. When the queue is full the
+        oldest pending request is dropped and its sources are folded into
+        the new one.
+        """
+        wanted = set(range(len(self.sources)) if indices is None else indices)
+        with self.cond:
+            if len(self.pending) >= self.queue_depth:
+                wanted |= self.pending.popleft()[1]
+                self.dropped += 1
+            self.pending.append((time.time(), wanted))
+            self.submitted += 1
+            self.cond.notify()
+
+    def _run(self):
+        while True:
+            with self.cond:
+                while self.running and not self.pending:
+                    self.cond.wait()
+                if not self.running:
+                    return
+                _, wanted = self.pending.popleft()
+            refs = {i: self.sources[i].read() for i in sorted(wanted)}
+            # Skip frames this worker has already run (the camera has not delivered a new one yet).
+            indices = [i for i, ref in refs.items() if ref.frame is not None and ref.frame_id != self.last_frame[i]]
+            self.duplicates += len(refs) - len(indices)
+            if not indices:
+                continue
+            refs = [refs[i] for i in indices]
+            for i, ref in zip(indices, refs):
+                self.last_frame[i] = ref.frame_id
+            try:
+                results = infer_blindspot_frames([ref.frame for ref in refs], [self.states[i] for i in indices],
+                                                 [self.sides[i] for i in indices])
+                for i, ref, (detections, reused) in zip(indices, refs, results):
+                    self.results.append((i, detections, ref.frame.shape, ref.captured, reused))
+            except Exception as e:
+                self.errors += 1
+                print(f"Detection worker error: {e}")
+            self.processed += 1
+
+    def poll(self):
+        """Apply finished results to their cameras' states on the calling thread; returns the number applied."""
+        applied = 0
+        while self.results:
+            i, detections, shape, captured, reused = self.results.popleft()
+            update_blindspot_state(detections, shape, self.states[i], self.sides[i], captured, log=not reused)
+            applied += 1
+        return applied
+
+    def stats(self):
+        """Return the worker's request counters."""
+        with self.cond:
+            return {"submitted": self.submitted, "processed": self.processed,
+                    "dropped": self.dropped, "pending": len(self.pending),
+                    "errors": self.errors, "duplicates": self.duplicates}
+
+    def stop(self, timeout=2.0):
+        """Stop the worker, discarding pending requests, and wait for the thread to exit."""
+        with self.cond:
+            self.running = False
+            self.pending.clear()
+            self.cond.notify_all()
+        if self.thread is not None:
+            self.thread.join(timeout)
+            if self.thread.is_alive():
+                print("Warning: Detection worker did not stop within timeout")
+            self.thread = None
@@ -0,0 +1,63 @@
+"""
+Backend parity test: the ONNX export must give the same detections as the
+PyTorch model on every input size detection uses, not just the export size.
+Skipped when torch, onnxruntime or the model weights are not available.
+
+    python -m unittest discover tests
+"""
+
+import os
+import sys
+import tempfile
+import unittest
+import importlib.util
+import numpy as np
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "src"))
+
+HAVE_RUNTIMES = all(importlib.util.find_spec(name) for name in ("torch", "onnx", "onnxruntime"))
+
+# (height, width) of ROI crops at several letterbox shapes, plus a full camera frame
+SHAPES = [(144, 240), (240, 144), (200, 320), (96, 96), (360, 640)]
+
+@unittest.skipUnless(HAVE_RUNTIMES, "torch, onnx and onnxruntime are required")
+class OnnxParityTest(unittest.TestCase):
+
+    @classmethod
+    def setUpClass(cls):
+        import adas_config
+        import adas_backends
+        if not os.path.exists(adas_config.MODEL_PATH):
+            raise unittest.SkipTest(f"model weights not found at {adas_config.MODEL_PATH}")
+        try:
+            cls.model = adas_config.load_model()
+        except RuntimeError as e:
+            raise unittest.SkipTest(str(e))
+        # Low threshold and all classes, so random frames still produce detections to compare.
+        cls.model.conf = 0.05
+        cls.model.classes = None
+        cls.tmp = tempfile.TemporaryDirectory()
+        assets_dir = adas_backends.ASSETS_DIR
+        adas_backends.ASSETS_DIR = cls.tmp.name   # always test a fresh export
+        try:
+            cls.reference = adas_backends.create_backend("torch", cls.model)
+            cls.candidate = adas_backends.create_backend("onnx", cls.model)
+        finally:
+            adas_backends.ASSETS_DIR = assets_dir
+        rng = np.random.default_rng(0)
+        cls.frames = [rng.integers(0, 256, shape + (3,), dtype=np.uint8) for shape in SHAPES]
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp.cleanup()
+
+    def test_single_frames_match(self):
+        from adas_backends import compare_backends
+        s = compare_backends(self.frames, self.reference, self.candidate)
+        self.assertEqual(s["matched"], s["reference"])
+        self.assertEqual(s["matched"], s["candidate"])
+        self.assertLessEqual(s["max_conf_diff"], 0.02)
+        self.assertLessEqual(s["max_box_diff"], 2.0)
+
+if __name__ == "__main__":
+    unittest.main()